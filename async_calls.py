@@ -0,0 +1,260 @@
+# Async provider adapters for MECCA
+# All coroutines run on one background event loop shared by every Streamlit
+# session, so hundreds of LLM requests can be in flight without an OS thread each.
+# Cache lookups are SQLite calls, so they run in a worker thread rather than on the loop.
+
+import asyncio
+import json
+import threading
+import anthropic
+import httpx
+import openai
+import google.generativeai as genai
+from core.clients import get_gemini_model
+from core.response_cache import get_named_cache, get_response_cache, make_cache_key
+from core.resilience import ProviderFailure, acall_with_resilience, provider_timeout
+from core.scheduler import current_request_context, request_context
+from core.tokens import estimate_tokens
+from custom_fcc import SEARCH_CACHE_TTL_SECONDS, normalize_query
+
+_loop = None
+_loop_lock = threading.Lock()
+
+# Async clients are bound to the background loop, so they are only built and used there
+_async_clients = {}
+_inflight_searches = {}
+
+def get_event_loop():
+    """The process-wide background event loop, started on first use"""
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mecca-async-loop", daemon=True).start()
+        return _loop
+
+def submit(coro):
+    """
+    Schedule a coroutine on the background loop from any thread.
+    Returns a concurrent.futures.Future, so results can be gathered with
+    core.parallel.collect_available alongside thread-pool calls.
+    """
+    # Tasks on the loop don't inherit the caller's context, so carry the scheduler identity over
+    session_id, priority = current_request_context()
+    
+    async def run_in_request_context():
+        with request_context(session_id, priority):
+            return await coro
+    
+    return asyncio.run_coroutine_threadsafe(run_in_request_context(), get_event_loop())
+
+def run_sync(coro, timeout=None):
+    """Run a coroutine on the background loop and block for its result"""
+    return submit(coro).result(timeout=timeout)
+
+def _get_async_client(registry_key, factory):
+    """Shared async client for this key (call only from the background loop)"""
+    client = _async_clients.get(registry_key)
+    if client is None:
+        client = factory()
+        _async_clients[registry_key] = client
+    return client
+
+def _get_async_openai(api_key):
+    return _get_async_client(
+        ("openai", api_key),
+        lambda: openai.AsyncOpenAI(api_key=api_key, timeout=provider_timeout("openai"), max_retries=0)
+    )
+
+def _get_async_anthropic(api_key):
+    return _get_async_client(
+        ("anthropic", api_key),
+        lambda: anthropic.AsyncAnthropic(api_key=api_key, timeout=provider_timeout("anthropic"), max_retries=0)
+    )
+
+def _get_async_http():
+    return _get_async_client(("http",), lambda: httpx.AsyncClient())
+
+async def acall_openai(prompt, api_key):
+    """Async version of call_openai (shares its response cache entries)"""
+    if not api_key:
+        return ProviderFailure("OpenAI API key not configured")
+    
+    try:
+        messages = [
+            {"role": "system", "content": "You are an expert editorial assistant focusing on comprehensive analysis."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        cache = get_response_cache()
+        cache_key = make_cache_key("openai", "gpt-4o", messages, 0.3, 2000)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            return cached
+        
+        client = _get_async_openai(api_key)
+        response = await acall_with_resilience(
+            "openai",
+            client.chat.completions.create,
+            model="gpt-4o",
+            messages=messages,
+            max_tokens=2000,
+            temperature=0.3,
+            scheduled_tokens=estimate_tokens(prompt) + 2000
+        )
+        result = response.choices[0].message.content.strip()
+        await asyncio.to_thread(cache.put, cache_key, result)
+        return result
+    except Exception as e:
+        return ProviderFailure(f"OpenAI API Error: {str(e)}", e)
+
+async def acall_anthropic(prompt, article_text, api_key):
+    """Async version of call_anthropic (shares its response cache entries)"""
+    if not api_key:
+        return ProviderFailure("Anthropic API key not configured")
+    
+    try:
+        cache = get_response_cache()
+        cache_key = make_cache_key("anthropic", "claude-3-5-sonnet-20241022", [prompt, article_text], 0.3, 2500)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            return cached
+        
+        client = _get_async_anthropic(api_key)
+        message = await acall_with_resilience(
+            "anthropic",
+            client.messages.create,
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2500,
+            temperature=0.3,
+            system=prompt,
+            messages=[
+                {"role": "user", "content": article_text}
+            ],
+            scheduled_tokens=estimate_tokens(prompt) + estimate_tokens(article_text) + 2500
+        )
+        result = message.content[0].text.strip()
+        await asyncio.to_thread(cache.put, cache_key, result)
+        return result
+    except Exception as e:
+        return ProviderFailure(f"Anthropic API Error: {str(e)}", e)
+
+async def acall_google(prompt, api_key):
+    """Async version of call_google (shares its response cache entries)"""
+    if not api_key:
+        return ProviderFailure("Google API key not configured")
+    
+    try:
+        cache = get_response_cache()
+        cache_key = make_cache_key("google", "gemini-1.5-pro", prompt, 0.3, 2000)
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            return cached
+        
+        model = get_gemini_model(api_key, 'gemini-1.5-pro')
+        response = await acall_with_resilience(
+            "google",
+            model.generate_content_async,
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=2000,
+                temperature=0.3,
+            ),
+            request_options={"timeout": provider_timeout("google")},
+            scheduled_tokens=estimate_tokens(prompt) + 2000
+        )
+        result = response.text.strip()
+        await asyncio.to_thread(cache.put, cache_key, result)
+        return result
+    except Exception as e:
+        return ProviderFailure(f"Google API Error: {str(e)}", e)
+
+async def acall_perplexity(prompt, api_key):
+    """Async version of call_perplexity"""
+    if not api_key:
+        return ProviderFailure("Perplexity API key not configured")
+    
+    try:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "llama-3.1-sonar-large-128k-online",
+            "messages": [
+                {"role": "system", "content": "You are an expert fact-checking assistant with web search capabilities."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.3,
+            "search_domain_filter": ["perplexity.ai"],
+            "return_citations": True,
+            "search_recency_filter": "month",
+            "top_p": 0.9,
+            "stream": False
+        }
+        
+        async def post_completion():
+            response = await _get_async_http().post(
+                "https://api.perplexity.ai/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=provider_timeout("perplexity")
+            )
+            response.raise_for_status()
+            return response
+        
+        response = await acall_with_resilience(
+            "perplexity", post_completion, scheduled_tokens=estimate_tokens(prompt) + 2000
+        )
+        result = response.json()
+        return result['choices'][0]['message']['content'].strip()
+            
+    except Exception as e:
+        return ProviderFailure(f"Perplexity API Error: {str(e)}", e)
+
+async def search_google_custom(query, api_key, search_engine_id):
+    """
+    Async version of custom_fcc.search_google_custom. Shares its on-disk cache
+    and merges identical searches already in flight on the loop.
+    """
+    cache = get_named_cache("search_results", ttl_seconds=SEARCH_CACHE_TTL_SECONDS)
+    cache_key = make_cache_key("google_custom_search", search_engine_id, normalize_query(query), None, 3)
+    
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        return json.loads(cached)
+    
+    inflight = _inflight_searches.get(cache_key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    
+    async def fetch():
+        async def get_results():
+            response = await _get_async_http().get(
+                "https://www.googleapis.com/customsearch/v1",
+                params={
+                    'key': api_key,
+                    'cx': search_engine_id,
+                    'q': query,
+                    'num': 3,  # Limit results to control costs
+                    'safe': 'medium'
+                },
+                timeout=provider_timeout("google_search")
+            )
+            response.raise_for_status()
+            return response
+        
+        try:
+            response = await acall_with_resilience("google_search", get_results)
+            search_result = {'items': response.json().get('items', [])[:3]}
+            await asyncio.to_thread(cache.put, cache_key, json.dumps(search_result))
+            return search_result
+        finally:
+            _inflight_searches.pop(cache_key, None)
+    
+    inflight = asyncio.ensure_future(fetch())
+    _inflight_searches[cache_key] = inflight
+    return await asyncio.shield(inflight)
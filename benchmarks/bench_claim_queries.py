@@ -0,0 +1,106 @@
+# Benchmark: search queries from structured claim extraction vs. the legacy line parser
+#
+# Offline it compares how many distinct, searchable queries each approach yields
+# from the same claims analysis. With GOOGLE_SEARCH_API_KEY and
+# GOOGLE_SEARCH_ENGINE_ID set it also runs the searches and reports useful
+# results (searches returning at least one hit) per search call.
+#
+# Run from the repository root: python benchmarks/bench_claim_queries.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_fcc import (
+    MAX_SEARCH_QUERIES,
+    extract_search_queries_from_text,
+    parse_claims,
+    rank_claims,
+    search_claims_concurrently,
+)
+
+# Typical free-text output from the old claim extraction prompt
+FREE_TEXT_ANALYSIS = """Here are the key factual claims that should be verified:
+
+1. **Claim:** "The city council approved a $4.2 million budget for the Riverside Park renovation in March 2023."
+   - **Why it needs verification:** Specific dollar figure and date are central to the story.
+   - **Authoritative sources:** City council meeting minutes, municipal budget documents.
+
+2. **Claim:** "Mayor Linda Torres said the project would create 150 jobs."
+   - **Why it needs verification:** Attributed statistic from an official.
+   - **Authoritative sources:** Press releases, recordings of the mayor's remarks.
+
+3. **Claim:** "Riverside Park is the oldest public park in the state, founded in 1851."
+   - **Why it needs verification:** Superlative historical claim.
+   - **Authoritative sources:** State historical society, park department records."""
+
+# The same claims as returned by the structured (JSON mode) extraction
+STRUCTURED_ANALYSIS = """{"claims": [
+  {"claim": "The city council approved a $4.2 million budget for the Riverside Park renovation in March 2023.",
+   "why": "Specific dollar figure and date are central to the story.",
+   "sources": "City council meeting minutes, municipal budget documents.",
+   "priority": "medium", "search_query": "Riverside Park renovation $4.2 million city council March 2023"},
+  {"claim": "Mayor Linda Torres said the project would create 150 jobs.",
+   "why": "Attributed statistic from an official.",
+   "sources": "Press releases, recordings of the mayor's remarks.",
+   "priority": "medium", "search_query": "Mayor Linda Torres Riverside Park 150 jobs"},
+  {"claim": "Riverside Park is the oldest public park in the state, founded in 1851.",
+   "why": "Superlative historical claim that is easy to get wrong.",
+   "sources": "State historical society, park department records.",
+   "priority": "high", "search_query": "oldest public park in state Riverside Park 1851"},
+  {"claim": "Riverside Park was founded in 1851.",
+   "why": "Duplicate of the founding claim.",
+   "sources": "State historical society.",
+   "priority": "low", "search_query": "Oldest public park in state - Riverside Park, 1851"}
+]}"""
+
+def _is_searchable(query):
+    """A query is useful if it is more than a label and carries a checkable detail"""
+    stripped = query.strip("*-: \"'").lower()
+    if not stripped or stripped.startswith(("claim", "why it", "authoritative", "here are")):
+        return False
+    return any(ch.isdigit() for ch in query) or any(word[:1].isupper() for word in query.split()[1:])
+
+def _report(label, queries, elapsed):
+    searchable = [q for q in queries if _is_searchable(q)]
+    print(f"{label}")
+    print(f"  queries produced:   {len(queries)}")
+    print(f"  searchable queries: {len(searchable)}")
+    print(f"  parse time:         {elapsed * 1e6:.1f} µs")
+    for query in queries:
+        print(f"    - {query!r}")
+
+def _timed(fn, arg, repeat=2000):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(arg)
+    return result, (time.perf_counter() - started) / repeat
+
+def main():
+    legacy_queries, legacy_time = _timed(extract_search_queries_from_text, FREE_TEXT_ANALYSIS)
+    structured_queries, structured_time = _timed(
+        lambda text: [claim['search_query'] for claim in rank_claims(parse_claims(text))],
+        STRUCTURED_ANALYSIS
+    )
+
+    _report("Legacy line parser", legacy_queries, legacy_time)
+    _report("Structured extraction (deduplicated, ranked)", structured_queries, structured_time)
+
+    api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
+    engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
+    if not (api_key and engine_id):
+        print("\nSet GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_ENGINE_ID to measure live results per search call.")
+        return
+
+    print(f"\nLive search (budget {MAX_SEARCH_QUERIES} calls per approach)")
+    for label, queries in (("legacy", legacy_queries), ("structured", structured_queries)):
+        calls = queries[:MAX_SEARCH_QUERIES]
+        results = search_claims_concurrently(calls, api_key, engine_id)
+        useful = sum(1 for result in results if result.get('results'))
+        rate = useful / len(calls) if calls else 0.0
+        print(f"  {label:<10} {useful}/{len(calls)} calls returned results ({rate:.0%} useful per call)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Benchmark: EiC quote validation against large specialist responses
+#
+# Compares the previous per-quote approach (lower-case every response again for
+# every quote, then substring search) with MECCAResponseValidator, which
+# attributes every quote to a specialist with a similarity score and span.
+# Below QUOTE_INDEX_MIN_CHARS of specialist text the validator uses a QuoteScan
+# (responses normalized once, then a plain substring search); above it, a
+# QuoteIndex of word trigrams, which also scores near-miss quotes but costs far
+# more to build. Reports time per validation cold (the app builds the matcher
+# when the analysis finishes and keeps it on the session's record) and warm
+# (every dialogue turn), and how many quotes each approach could verify - both
+# matchers also accept curly quotes and re-wrapped text. The dialogue budget
+# is 50 ms.
+#
+# Run from the repository root: python benchmarks/bench_quote_validation.py
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mecca_dialogue_prototype_calls import MECCAResponseValidator, QUOTE_INDEX_MIN_CHARS, build_quote_matcher
+
+RESPONSE_SIZES = (1500, 12000)
+QUOTE_COUNT = 60
+REPEATS = 20
+
+VOCABULARY = (
+    "the council budget mayor park renovation officials said project jobs "
+    "residents verify source attribution paragraph claim report city state "
+    "million during meeting records historical founded public oldest statement"
+).split()
+
+def make_response(rng, words):
+    text = []
+    for i in range(words):
+        text.append(rng.choice(VOCABULARY))
+        if i % 17 == 16:
+            text.append("\n")
+    return " ".join(text).replace(" \n ", "\n")
+
+def make_answer(rng, responses):
+    """An EiC answer quoting real passages (some with curly quotes or re-wrapped) plus invented ones"""
+    parts = []
+    for i in range(QUOTE_COUNT):
+        if i % 4 == 3:
+            quote = " ".join(rng.choice(VOCABULARY) for _ in range(8)) + " invented"
+        else:
+            words = rng.choice(responses).split()
+            start = rng.randrange(len(words) - 10)
+            quote = " ".join(words[start:start + 8])
+            if i % 4 == 1:
+                quote = quote.replace(" ", "  ", 2)
+        opening, closing = ("“", "”") if i % 4 == 2 else ('"', '"')
+        parts.append(f"As one specialist put it, {opening}{quote}{closing} which matters here.")
+    return "\n".join(parts)
+
+def legacy_validate(eic_response, specialist_responses):
+    """The validator's previous quote check, kept here as the baseline"""
+    flags = []
+    for quote in re.findall(r'"([^"]*)"', eic_response):
+        if len(quote) > 10:
+            found = False
+            for response in specialist_responses.values():
+                if quote.lower() in response.lower():
+                    found = True
+                    break
+            if not found:
+                flags.append(quote)
+    return flags
+
+def time_call(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - started) / repeats, result
+
+def run(response_words):
+    rng = random.Random(7)
+    responses = {name: make_response(rng, response_words) for name in ("gpt", "gemini", "perplexity")}
+    answer = make_answer(rng, list(responses.values()))
+    validator = MECCAResponseValidator()
+
+    legacy_seconds, legacy_flags = time_call(lambda: legacy_validate(answer, responses), REPEATS)
+
+    cold_seconds, _ = time_call(lambda: validator.validate_specialist_quotes(answer, responses), 1)
+    quote_matcher = build_quote_matcher(responses)
+    warm_seconds, index_flags = time_call(
+        lambda: validator.validate_specialist_quotes(answer, responses, quote_matcher=quote_matcher), REPEATS
+    )
+
+    corpus_chars = sum(len(response) for response in responses.values())
+    matcher = "index" if corpus_chars >= QUOTE_INDEX_MIN_CHARS else "scan"
+    attributed = sum(1 for attribution in validator.quote_attributions if attribution["specialist"])
+    print(f"Specialist responses: {len(responses)} x {response_words:,} words ({corpus_chars:,} chars)")
+    print(f"Quotes in EiC answer: {QUOTE_COUNT} ({QUOTE_COUNT // 4} invented)")
+    print()
+    print(f"{'approach':<28}{'ms / validation':>16}{'unverified':>12}")
+    print(f"{'legacy lower() per quote':<28}{legacy_seconds * 1000:>16.2f}{len(legacy_flags):>12}")
+    print(f"{matcher + ' build + validation':<28}{cold_seconds * 1000:>16.2f}{len(index_flags):>12}")
+    print(f"{matcher + ' warm (dialogue turn)':<28}{warm_seconds * 1000:>16.2f}{len(index_flags):>12}")
+    print(f"Quotes attributed to a specialist: {attributed} of {len(validator.quote_attributions)}")
+    print()
+
+def main():
+    for response_words in RESPONSE_SIZES:
+        run(response_words)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from core.resilience import ProviderFailure, is_failure
+from core.session_records import deep_size, full_length
+
+# Persistent store for analyses and dialogue, keyed by session ID.
+# A session's analysis is held in memory only while it is in use: records are
+# loaded from the store on first access, written back when they go idle, and
+# evicted, so server memory is bounded by the number of active sessions rather
+# than every tab ever opened. A writer who reconnects with the same session ID
+# picks up where they left off.
+
+DEFAULT_STORE_PATH = os.getenv("MECCA_STORE_PATH", ".mecca_sessions.sqlite3")
+STORE_ENABLED = os.getenv("MECCA_STORE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+# Analyses untouched for this long are deleted from the store
+DEFAULT_RETENTION_SECONDS = int(os.getenv("MECCA_STORE_RETENTION_SECONDS", str(30 * 24 * 3600)))
+
+# Sessions idle this long are written back and dropped from memory
+SESSION_IDLE_SECONDS = int(os.getenv("MECCA_SESSION_IDLE_SECONDS", "900"))
+
+# Most analyses kept in memory at once; the least recently used are evicted first
+MAX_ACTIVE_SESSIONS = int(os.getenv("MECCA_MAX_ACTIVE_SESSIONS", "500"))
+
+def _encode(value):
+    """JSON for a stored field - specialist failures keep their failure marker"""
+    def mark_failures(item):
+        if is_failure(item):
+            return {"__failure__": str(item)}
+        if hasattr(item, "to_dict"):
+            item = item.to_dict()
+        if isinstance(item, dict):
+            return {key: mark_failures(inner) for key, inner in item.items()}
+        if isinstance(item, list):
+            return [mark_failures(inner) for inner in item]
+        return item
+    return json.dumps(mark_failures(value), ensure_ascii=False, default=str)
+
+def _decode(text):
+    def restore_failures(item):
+        if isinstance(item, dict):
+            if set(item) == {"__failure__"}:
+                return ProviderFailure(item["__failure__"])
+            return {key: restore_failures(inner) for key, inner in item.items()}
+        if isinstance(item, list):
+            return [restore_failures(inner) for inner in item]
+        return item
+    return restore_failures(json.loads(text))
+
+class AnalysisStore:
+    """
+    Where analyses live between requests. An analysis is a set of named fields
+    plus lists stored entry by entry (dialogue exchanges, validation records). Another
+    backend only needs to implement these five methods.
+    """
+
+    def load(self, session_id, limits=None):
+        """
+        (fields, {list name: (offset, entries)}) for a session, or None if nothing
+        is stored. A list named in `limits` ({list name: n}) comes back as its
+        newest n entries, with `offset` the position of the first.
+        """
+        raise NotImplementedError
+
+    def load_entries(self, session_id, list_name, start, stop):
+        """A list's stored entries from position `start` up to `stop`"""
+        raise NotImplementedError
+
+    def save(self, session_id, fields, appended):
+        """
+        Replace the fields, and each named list from a position onward
+        ({list name: (start index, entries)}); stored entries at or past the
+        start index are replaced by `entries`.
+        """
+        raise NotImplementedError
+
+    def clear(self, session_id):
+        """Forget a session's analysis and dialogue"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Drop analyses past the retention period"""
+        raise NotImplementedError
+
+class SQLiteAnalysisStore(AnalysisStore):
+    """Analyses in a local SQLite file: one row of fields per session, one row per list entry"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "session_id TEXT PRIMARY KEY, fields TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_entries ("
+            "session_id TEXT NOT NULL, list TEXT NOT NULL, position INTEGER NOT NULL, entry TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, list, position))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_updated ON analyses (updated_at)")
+
+    def load(self, session_id, limits=None):
+        limits = limits or {}
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields FROM analyses WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            list_names = [name for name, in self._conn.execute(
+                "SELECT DISTINCT list FROM analysis_entries WHERE session_id = ?", (session_id,)
+            )]
+            # Newest rows first so a limit keeps the tail; a limit of -1 means no limit
+            rows = {
+                list_name: self._conn.execute(
+                    "SELECT position, entry FROM analysis_entries WHERE session_id = ? AND list = ? "
+                    "ORDER BY position DESC LIMIT ?",
+                    (session_id, list_name, limits.get(list_name, -1))
+                ).fetchall()[::-1]
+                for list_name in list_names
+            }
+
+        lists = {
+            list_name: (entries[0][0] if entries else 0, [_decode(entry) for _, entry in entries])
+            for list_name, entries in rows.items()
+        }
+        return _decode(row[0]), lists
+
+    def load_entries(self, session_id, list_name, start, stop):
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT entry FROM analysis_entries WHERE session_id = ? AND list = ? "
+                "AND position >= ? AND position < ? ORDER BY position",
+                (session_id, list_name, start, stop)
+            ).fetchall()
+        return [_decode(entry) for entry, in entries]
+
+    def save(self, session_id, fields, appended):
+        encoded_fields = _encode(fields)
+        encoded_entries = [
+            (session_id, list_name, start + offset, _encode(entry))
+            for list_name, (start, entries) in appended.items()
+            for offset, entry in enumerate(entries)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (session_id, fields, updated_at) VALUES (?, ?, ?)",
+                    (session_id, encoded_fields, time.time())
+                )
+                self._conn.executemany(
+                    "DELETE FROM analysis_entries WHERE session_id = ? AND list = ? AND position >= ?",
+                    [(session_id, list_name, start) for list_name, (start, _) in appended.items()]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_entries (session_id, list, position, entry) VALUES (?, ?, ?, ?)",
+                    encoded_entries
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_entries WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM analyses WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self):
+        if not self.retention_seconds:
+            return
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM analysis_entries WHERE session_id IN (SELECT session_id FROM analyses WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            self._conn.execute("DELETE FROM analyses WHERE updated_at < ?", (cutoff,))
+
+class _DisabledStore(AnalysisStore):
+    """Stand-in used when persistence is switched off - sessions live in memory only"""
+
+    def load(self, session_id, limits=None):
+        return None
+
+    def load_entries(self, session_id, list_name, start, stop):
+        return []
+
+    def save(self, session_id, fields, appended):
+        pass
+
+    def clear(self, session_id):
+        pass
+
+    def purge_expired(self):
+        pass
+
+class SessionRecord:
+    """
+    One session's analysis in memory, with how much of each list is already
+    stored and which list objects those counts belong to
+    """
+
+    __slots__ = ("fields", "stored_counts", "stored_lists", "last_seen", "write_lock")
+
+    def __init__(self, fields, stored_counts=None):
+        self.fields = fields
+        self.stored_counts = stored_counts or {}
+        self.stored_lists = {name: fields.get(name) for name in self.stored_counts}
+        self.last_seen = time.monotonic()
+        # Serializes write-backs of this session (its own saves and eviction)
+        self.write_lock = threading.Lock()
+
+class SessionCache:
+    """
+    Analysis records for active sessions. `new_fields()` supplies the defaults for
+    a session with nothing stored; `list_fields` names the fields that are stored
+    entry by entry, appending new entries and rewriting a list that was replaced
+    or shortened (a list with a `cap` keeps only that many in memory). Fields named
+    in `transient_fields` are kept in memory only (rebuilt on demand) and
+    `on_load(fields)` can rebuild them after a resume.
+    idle_seconds=None and max_sessions=0 turn eviction off.
+    """
+
+    def __init__(self, store, new_fields, list_fields, transient_fields=(), on_load=None,
+                 idle_seconds=SESSION_IDLE_SECONDS, max_sessions=MAX_ACTIVE_SESSIONS):
+        self.store = store
+        self.new_fields = new_fields
+        self.list_fields = tuple(list_fields)
+        self.transient_fields = tuple(transient_fields)
+        self.on_load = on_load
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """The session's record, loading it from the store if it is not in memory"""
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is not None:
+                self._records.move_to_end(session_id)
+                record.last_seen = time.monotonic()
+                return record
+
+        record = self._load(session_id)
+        with self._lock:
+            # Another run of the same session may have loaded it meanwhile
+            record = self._records.setdefault(session_id, record)
+            self._records.move_to_end(session_id)
+
+        self._evict()
+        return record
+
+    def _load(self, session_id):
+        fields = self.new_fields()
+        self._attach_store(session_id, fields)
+        # Capped lists only need their newest entries in memory
+        limits = {name: fields[name].cap for name in self.list_fields if getattr(fields[name], "cap", None)}
+        stored = self.store.load(session_id, limits)
+        if stored is None:
+            return SessionRecord(fields)
+
+        stored_fields, lists = stored
+        fields.update(stored_fields)
+        for name in self.list_fields:
+            # Fill the default list in place so list types such as SpillList are kept
+            offset, entries = lists.get(name, (0, []))
+            fields[name].extend(entries)
+            if offset:
+                fields[name].offset = offset
+        if self.on_load:
+            self.on_load(fields)
+        return SessionRecord(fields, {name: full_length(fields[name]) for name in self.list_fields})
+
+    def _attach_store(self, session_id, fields, names=None):
+        """Let spill lists read their dropped entries back from the store"""
+        for name in names or self.list_fields:
+            if hasattr(fields[name], "fetch"):
+                fields[name].fetch = partial(self.store.load_entries, session_id, name)
+
+    def _evictable(self):
+        """(session ID, record, last seen) for idle records, and the least recently used beyond the cap"""
+        now = time.monotonic()
+        candidates = []
+        for session_id, record in self._records.items():
+            idle = self.idle_seconds is not None and now - record.last_seen >= self.idle_seconds
+            over_cap = bool(self.max_sessions) and len(self._records) - len(candidates) > self.max_sessions
+            if not (idle or over_cap):
+                break
+            candidates.append((session_id, record, record.last_seen))
+        return candidates
+
+    def _evict(self):
+        """
+        Write back idle records and those beyond the cap, then drop them from
+        memory; returns how many were dropped. Records stay in memory until
+        they are written, so a run that loads the session meanwhile gets it
+        from here rather than an out-of-date copy from the store.
+        """
+        with self._lock:
+            candidates = self._evictable()
+        for session_id, record, _ in candidates:
+            self._write(session_id, record)
+
+        evicted = 0
+        with self._lock:
+            for session_id, record, last_seen in candidates:
+                # A session picked up again during the write stays; it is written back later
+                if self._records.get(session_id) is record and record.last_seen == last_seen:
+                    del self._records[session_id]
+                    evicted += 1
+        return evicted
+
+    def _write(self, session_id, record):
+        with record.write_lock:
+            fields = {
+                name: value for name, value in record.fields.items()
+                if name not in self.list_fields and name not in self.transient_fields
+            }
+            changed = {}
+            for name in self.list_fields:
+                entries = record.fields.get(name, [])
+                # Lists with an `offset` have already dropped that many stored entries from memory
+                offset = getattr(entries, "offset", 0)
+                stored = record.stored_counts.get(name, offset)
+                if entries is not record.stored_lists.get(name, entries) or offset + len(entries) < stored:
+                    # Replaced or shortened since the last write: rewrite what is in memory
+                    changed[name] = (offset, list(entries))
+                elif offset + len(entries) > stored:
+                    changed[name] = (stored, entries[stored - offset:])
+                else:
+                    continue
+                record.stored_counts[name] = offset + len(entries)
+                record.stored_lists[name] = entries
+            self.store.save(session_id, fields, changed)
+            for name in self.list_fields:
+                self._spill(record, name)
+
+    def _spill(self, record, name):
+        """Drop stored entries beyond a list's `cap` from memory, keeping the newest"""
+        entries = record.fields.get(name)
+        cap = getattr(entries, "cap", None)
+        if cap is None or len(entries) <= cap:
+            return
+        drop = min(len(entries) - cap, record.stored_counts.get(name, 0) - entries.offset)
+        if drop > 0:
+            del entries[:drop]
+            entries.offset += drop
+
+    def save(self, session_id):
+        """Write a session's fields and any new list entries to the store"""
+        with self._lock:
+            record = self._records.get(session_id)
+        if record is not None:
+            self._write(session_id, record)
+
+    def set_field(self, session_id, name, value):
+        """
+        Set one field of a session's analysis. A list field given a new list
+        keeps its default list type (and cap) and is rewritten in the store on
+        the next save.
+        """
+        fields = self.get(session_id).fields
+        if name in self.list_fields and value is not fields.get(name):
+            entries = self.new_fields()[name]
+            entries.extend(value)
+            value = entries
+        fields[name] = value
+        if name in self.list_fields:
+            self._attach_store(session_id, fields, (name,))
+
+    def reset(self, session_id):
+        """Start a session over: defaults in memory, nothing in the store"""
+        self.store.clear(session_id)
+        record = SessionRecord(self.new_fields())
+        self._attach_store(session_id, record.fields)
+        with self._lock:
+            self._records[session_id] = record
+            self._records.move_to_end(session_id)
+        return record
+
+    def sweep(self):
+        """Write back and evict idle sessions; returns how many were evicted"""
+        return self._evict()
+
+    def memory_report(self, session_id=None):
+        """
+        Approximate memory held by the sessions in memory, for capacity planning.
+        With a session_id, also that session's total and its largest fields.
+        """
+        with self._lock:
+            records = list(self._records.items())
+        sizes = {record_id: deep_size(record.fields) for record_id, record in records}
+        report = {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes.values()),
+            "largest_bytes": max(sizes.values(), default=0)
+        }
+        if session_id in sizes:
+            fields = dict(records)[session_id].fields
+            report["session_bytes"] = sizes[session_id]
+            report["session_fields"] = dict(sorted(
+                ((name, deep_size(value)) for name, value in fields.items()),
+                key=lambda item: -item[1]
+            ))
+        return report
+
+    def __len__(self):
+        return len(self._records)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_analysis_store():
+    """Process-wide analysis store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SQLiteAnalysisStore() if STORE_ENABLED else _DisabledStore()
+            _store.purge_expired()
+        return _store
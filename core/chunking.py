@@ -0,0 +1,140 @@
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from core.error_records import combine_reports, parse_error_report
+from core.resilience import ProviderFailure, is_failure
+
+# Long-article support: split on paragraph boundaries, review the sections in
+# parallel and merge the findings before EiC synthesis. Paragraphs are labelled
+# with their position in the full article so "Para N:" references stay correct.
+
+# Articles longer than this (words) are reviewed in sections
+CHUNK_THRESHOLD_WORDS = int(os.getenv("MECCA_CHUNK_THRESHOLD_WORDS", "3000"))
+
+# Target section size (words); a single paragraph longer than this becomes its own section
+CHUNK_WORDS = int(os.getenv("MECCA_CHUNK_WORDS", "1500"))
+
+# Section reviews run here rather than in the specialist pool, which is already
+# busy running the specialist calls that wait on them
+_chunk_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mecca-chunk")
+
+def count_words(text):
+    return len(text.split())
+
+def needs_chunking(article_text, threshold=CHUNK_THRESHOLD_WORDS):
+    """True when an article is long enough to be reviewed in sections"""
+    return count_words(article_text) > threshold
+
+def split_paragraphs(text):
+    """Split on blank lines; fall back to single line breaks for text pasted without them"""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if len(paragraphs) == 1:
+        paragraphs = [p.strip() for p in text.splitlines() if p.strip()]
+    return paragraphs
+
+def chunk_article(article_text, max_words=CHUNK_WORDS):
+    """
+    Group paragraphs into sections of roughly max_words.
+    Returns a list of dicts with first_para/last_para (1-based) and the section
+    text, where every paragraph is prefixed with its article-wide "[Para N]" label.
+    """
+    chunks = []
+    current = []
+    current_words = 0
+
+    for number, paragraph in enumerate(split_paragraphs(article_text), start=1):
+        words = count_words(paragraph)
+        if current and current_words + words > max_words:
+            chunks.append(current)
+            current = []
+            current_words = 0
+        current.append((number, paragraph))
+        current_words += words
+
+    if current:
+        chunks.append(current)
+
+    return [
+        {
+            "first_para": section[0][0],
+            "last_para": section[-1][0],
+            "text": "\n\n".join(f"[Para {number}] {paragraph}" for number, paragraph in section)
+        }
+        for section in chunks
+    ]
+
+def chunk_article_text(chunk, chunk_count, headline=""):
+    """Article text for one section's prompt, telling the specialist which part it is seeing"""
+    header = (
+        f"NOTE: This is section {chunk['index'] + 1} of {chunk_count} of a longer article "
+        f"(paragraphs {chunk['first_para']}-{chunk['last_para']}). Review only this section. "
+        "Each paragraph is labelled with its number in the full article - use exactly those "
+        "numbers in any \"Para N\" reference."
+    )
+    if headline:
+        header += f"\nARTICLE HEADLINE: {headline}"
+    return f"{header}\n\n{chunk['text']}"
+
+def prepare_chunks(article_text, headline=""):
+    """Chunk an article and build each section's prompt text"""
+    chunks = chunk_article(article_text)
+    for index, chunk in enumerate(chunks):
+        chunk["index"] = index
+        chunk["prompt_text"] = chunk_article_text(chunk, len(chunks), headline)
+    return chunks
+
+def merge_error_reports(responses):
+    """
+    Merge Gemini "Para N: ..." correction lists from each section into one list
+    ordered by paragraph, dropping duplicates and per-section "NO ERRORS DETECTED".
+    """
+    reports = []
+    notes = []
+
+    for chunk, response in responses:
+        paragraphs = f"Paragraphs {chunk['first_para']}-{chunk['last_para']}"
+        if is_failure(response):
+            notes.append(f"[{paragraphs} could not be scanned: {response}]")
+            continue
+        report = parse_error_report(response)
+        if report is None:
+            notes.append(f"[{paragraphs} - unformatted output]\n{response.strip()}")
+        else:
+            reports.append(report)
+
+    merged = [combine_reports(reports).to_text()] if reports else []
+    return "\n".join(merged + notes)
+
+def merge_section_reviews(responses):
+    """Join free-form section reviews under paragraph-range headings"""
+    sections = []
+    for chunk, response in responses:
+        heading = f"**Paragraphs {chunk['first_para']}-{chunk['last_para']}**"
+        if is_failure(response):
+            sections.append(f"{heading}\n[This section could not be reviewed: {response}]")
+        else:
+            sections.append(f"{heading}\n{response.strip()}")
+    return "\n\n".join(sections)
+
+def review_in_chunks(call_fn, prompts, api_key, merge):
+    """
+    Map-reduce one specialist over an article's sections: call_fn(prompt, api_key)
+    runs for every (chunk, prompt) pair concurrently, and merge() combines the
+    (chunk, response) pairs. Fails only if every section failed.
+    """
+    futures = [
+        (chunk, _chunk_executor.submit(contextvars.copy_context().run, call_fn, prompt, api_key))
+        for chunk, prompt in prompts
+    ]
+
+    responses = []
+    for chunk, future in futures:
+        try:
+            responses.append((chunk, future.result()))
+        except Exception as e:
+            responses.append((chunk, ProviderFailure(f"Specialist Error: {str(e)}", e)))
+
+    if all(is_failure(response) for _, response in responses):
+        return responses[0][1]
+    return merge(responses)
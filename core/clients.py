@@ -0,0 +1,77 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import anthropic
+import openai
+import google.generativeai as genai
+from core.resilience import provider_timeout
+
+# Process-wide registry of provider clients, keyed by (provider, api_key, ...).
+# Clients are shared across Streamlit sessions and reruns so each call reuses
+# warm keep-alive connections instead of paying for a new TLS handshake.
+_registry = {}
+_registry_lock = threading.Lock()
+
+# Gemini's SDK holds its credentials globally, so remember which key is active
+_gemini_configured_key = None
+
+# Keep-alive connections held by the shared plain-HTTP session
+HTTP_POOL_MAXSIZE = int(os.getenv("MECCA_HTTP_POOL_MAXSIZE", "20"))
+
+def _get_or_create(registry_key, factory):
+    """Return the registered client for this key, building it once on first use"""
+    client = _registry.get(registry_key)
+    if client is not None:
+        return client
+
+    with _registry_lock:
+        client = _registry.get(registry_key)
+        if client is None:
+            client = factory()
+            _registry[registry_key] = client
+        return client
+
+# SDK-level retries are disabled: core.resilience owns retry, backoff and circuit breaking
+
+def get_openai_client(api_key):
+    """Shared OpenAI client for this API key (the SDK keeps its own keep-alive pool)"""
+    return _get_or_create(
+        ("openai", api_key),
+        lambda: openai.OpenAI(api_key=api_key, timeout=provider_timeout("openai"), max_retries=0)
+    )
+
+def get_anthropic_client(api_key):
+    """Shared Anthropic client for this API key (the SDK keeps its own keep-alive pool)"""
+    return _get_or_create(
+        ("anthropic", api_key),
+        lambda: anthropic.Anthropic(api_key=api_key, timeout=provider_timeout("anthropic"), max_retries=0)
+    )
+
+def get_gemini_model(api_key, model_name):
+    """Shared Gemini model handle for this API key and model"""
+    global _gemini_configured_key
+
+    with _registry_lock:
+        if _gemini_configured_key != api_key:
+            genai.configure(api_key=api_key)
+            _gemini_configured_key = api_key
+            # Model handles bound to the previous key's transport are no longer valid
+            for registry_key in [k for k in _registry if k[0] == "gemini"]:
+                del _registry[registry_key]
+
+    return _get_or_create(
+        ("gemini", api_key, model_name),
+        lambda: genai.GenerativeModel(model_name)
+    )
+
+def get_http_session():
+    """Shared requests session for plain HTTP APIs (Perplexity, Google Custom Search)"""
+    def build_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    return _get_or_create(("http",), build_session)
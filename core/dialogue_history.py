@@ -0,0 +1,103 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from core.resilience import is_failure
+from core.session_records import entries_from, full_length
+from core.tokens import estimate_tokens
+
+# Bounded dialogue history. Only the most recent exchanges are replayed word for
+# word; older ones are folded into a running summary. Folding is incremental -
+# each update summarizes just the newly evicted exchanges into the existing
+# summary - and runs in the background after a turn, so it never delays an answer.
+
+# Exchanges replayed verbatim on every turn
+HISTORY_KEEP_EXCHANGES = int(os.getenv("MECCA_HISTORY_KEEP_EXCHANGES", "4"))
+
+# Token budget for the verbatim exchanges; the oldest are dropped first when over it
+HISTORY_TOKEN_BUDGET = int(os.getenv("MECCA_HISTORY_TOKEN_BUDGET", "6000"))
+
+# Cap for the fallback summary used when the summarizer call fails
+FALLBACK_SUMMARY_TOKENS = 800
+
+_summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mecca-summary")
+
+def exchange_tokens(exchange):
+    return estimate_tokens(exchange["question"]) + estimate_tokens(exchange["answer"])
+
+def recent_exchanges(dialogue_history, summarized_count, keep=HISTORY_KEEP_EXCHANGES, budget=HISTORY_TOKEN_BUDGET,
+                     summary_pending=False):
+    """
+    Exchanges to replay verbatim: everything not yet folded into the summary, at
+    most `keep` of them, trimmed from the oldest to fit `budget`. The latest
+    exchange is always kept. While a summary update is still running
+    (`summary_pending`), every unsummarized exchange is replayed instead, since
+    the ones it would trim are not in the summary yet. Exchanges no longer held
+    in memory are read back from the store.
+    """
+    start = summarized_count if summary_pending else max(summarized_count, full_length(dialogue_history) - keep)
+    unsummarized = entries_from(dialogue_history, start)
+    if summary_pending:
+        return unsummarized
+
+    selected = []
+    used = 0
+    for exchange in reversed(unsummarized):
+        tokens = exchange_tokens(exchange)
+        if selected and used + tokens > budget:
+            break
+        selected.append(exchange)
+        used += tokens
+    return selected[::-1]
+
+def fallback_summary(summary, exchanges):
+    """Extractive summary: one line per exchange, oldest lines dropped beyond the cap"""
+    lines = summary.splitlines() if summary else []
+    for exchange in exchanges:
+        answer = " ".join(exchange["answer"].split())
+        lines.append(f"- Writer asked: {exchange['question'][:200]} | Editor: {answer[:300]}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > FALLBACK_SUMMARY_TOKENS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+def _fold(summarize_fn, summary, exchanges, summarized_count):
+    updated = summarize_fn(summary, exchanges)
+    if is_failure(updated) or not updated.strip():
+        updated = fallback_summary(summary, exchanges)
+    return updated.strip(), summarized_count
+
+def apply_finished_summary(session_state):
+    """Adopt a completed background summary update, if there is one"""
+    job = session_state.get('dialogue_summary_job')
+    if job is None or not job.done():
+        return
+    session_state.dialogue_summary_job = None
+    try:
+        summary, summarized_count = job.result()
+    except Exception:
+        return
+    session_state.dialogue_summary = summary
+    session_state.dialogue_summarized_count = summarized_count
+
+def schedule_summary_update(session_state, summarize_fn, keep=HISTORY_KEEP_EXCHANGES, budget=HISTORY_TOKEN_BUDGET):
+    """
+    Fold exchanges that have fallen out of the verbatim window - beyond `keep`
+    or trimmed for `budget` - into the summary, in the background.
+    `summarize_fn(summary, exchanges)` returns the updated summary text. Only one
+    update runs at a time per session; exchanges evicted meanwhile are replayed
+    in full and folded by the next one.
+    """
+    apply_finished_summary(session_state)
+    if session_state.get('dialogue_summary_job') is not None:
+        return
+
+    history = session_state.dialogue_history
+    summarized_count = session_state.get('dialogue_summarized_count', 0)
+    target_count = full_length(history) - len(recent_exchanges(history, summarized_count, keep, budget))
+    if target_count <= summarized_count:
+        return
+
+    exchanges = entries_from(history, summarized_count)[:target_count - summarized_count]
+    session_state.dialogue_summary_job = _summary_executor.submit(
+        contextvars.copy_context().run,
+        _fold, summarize_fn, session_state.get('dialogue_summary', ""), exchanges, target_count
+    )
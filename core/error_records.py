@@ -0,0 +1,121 @@
+import re
+from collections import namedtuple
+
+# Structured form of the Gemini error-detection output. The utility prompt
+# forces one correction per line:
+#     Para N: TYPE | "wrong" → "right" | Reason: X
+# so it can be parsed once into records and indexed, instead of every consumer
+# re-scanning the raw text.
+
+# `source` is empty for Gemini's own corrections and LOCAL_SOURCE for the rule-based pre-pass
+ErrorRecord = namedtuple("ErrorRecord", ["paragraph", "error_type", "wrong", "fix", "reason", "source"], defaults=("",))
+
+LOCAL_SOURCE = "local"
+
+# First line of the copy-editing response when Gemini was skipped for a short text
+LOCAL_ONLY_NOTE = "LOCAL PRE-CHECK ONLY - Gemini was not called for this short text."
+
+_RECORD_LINE = re.compile(
+    r'^\s*(?:[•*-]\s*)?Para\s+(?P<paragraph>\d+)\s*:\s*(?P<error_type>[A-Za-z_ ]+?)\s*\|\s*'
+    r'["“](?P<wrong>.*?)["”]\s*(?:→|->)\s*["“](?P<fix>.*?)["”]\s*'
+    r'(?:\|\s*Reason:\s*(?P<reason>.*?))?\s*(?:\|\s*Source:\s*(?P<source>\w+))?\s*$',
+    re.IGNORECASE
+)
+
+NO_ERRORS = "NO ERRORS DETECTED"
+
+class ErrorReport:
+    """Parsed Gemini output: records, any lines that did not match the format, and lookups by paragraph/type"""
+
+    __slots__ = ("records", "unparsed", "by_paragraph", "by_type")
+
+    def __init__(self, records, unparsed=()):
+        self.records = sorted(records, key=lambda record: record.paragraph)
+        self.unparsed = list(unparsed)
+        self.by_paragraph = {}
+        self.by_type = {}
+        for record in self.records:
+            self.by_paragraph.setdefault(record.paragraph, []).append(record)
+            self.by_type.setdefault(record.error_type, []).append(record)
+
+    @property
+    def is_clean(self):
+        """True when Gemini reported no errors"""
+        return not self.records and not self.unparsed
+
+    def type_counts(self):
+        return {error_type: len(records) for error_type, records in self.by_type.items()}
+
+    def quoted_text(self):
+        """Lower-cased wrong/fix strings, for checking quotes of Gemini's corrections"""
+        return {text.lower() for record in self.records for text in (record.wrong, record.fix) if text}
+
+    def to_text(self):
+        """Canonical line format, as the utility itself would have produced it"""
+        if self.is_clean:
+            return NO_ERRORS
+        return "\n".join([format_record(record) for record in self.records] + self.unparsed)
+
+    def to_compact(self):
+        """Short form for synthesis prompts: one line per correction, no boilerplate"""
+        if self.is_clean:
+            return NO_ERRORS
+        lines = [
+            f"P{record.paragraph} {record.error_type}: {record.wrong} → {record.fix}"
+            + (" (local pre-check)" if record.source == LOCAL_SOURCE else "")
+            for record in self.records
+        ]
+        return "\n".join(lines + self.unparsed)
+
+def format_record(record):
+    line = f'Para {record.paragraph}: {record.error_type} | "{record.wrong}" → "{record.fix}"'
+    if record.reason:
+        line += f" | Reason: {record.reason}"
+    if record.source:
+        line += f" | Source: {record.source}"
+    return line
+
+def parse_error_report(text):
+    """
+    Parse Gemini error-detection output into an ErrorReport, dropping exact duplicates.
+    Lines that mention a paragraph but do not match the strict format are kept as
+    `unparsed` so nothing Gemini said is silently lost. Returns None when the text
+    is not in the utility's format at all, so callers can fall back to the raw text.
+    """
+    records = []
+    unparsed = []
+    seen = set()
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.upper().strip(". ") == NO_ERRORS:
+            continue
+
+        match = _RECORD_LINE.match(line)
+        if match:
+            record = ErrorRecord(
+                int(match.group("paragraph")),
+                match.group("error_type").strip().upper().replace(" ", "_"),
+                match.group("wrong"),
+                match.group("fix"),
+                (match.group("reason") or "").strip(),
+                (match.group("source") or "").lower()
+            )
+            if record not in seen:
+                seen.add(record)
+                records.append(record)
+        elif re.match(r"^\s*(?:[•*-]\s*)?Para\s+\d+", line, re.IGNORECASE) and line not in unparsed:
+            unparsed.append(line)
+
+    if not records and not unparsed and NO_ERRORS not in text.upper():
+        return None
+    return ErrorReport(records, unparsed)
+
+def combine_reports(reports):
+    """Combine reports from several article sections into one"""
+    records = []
+    unparsed = []
+    for report in reports:
+        records.extend(report.records)
+        unparsed.extend(report.unparsed)
+    return ErrorReport(list(dict.fromkeys(records)), list(dict.fromkeys(unparsed)))
@@ -0,0 +1,105 @@
+import os
+import re
+from core.chunking import count_words, split_paragraphs
+from core.error_records import LOCAL_ONLY_NOTE, LOCAL_SOURCE, ErrorRecord, ErrorReport, combine_reports, parse_error_report
+from core.resilience import is_failure
+
+# Rule-based pre-pass for the mechanical errors the Gemini utility scans for.
+# Only high-precision patterns live here - anything that needs judgement is
+# left to Gemini. Findings use the same records as the Gemini parser, so they
+# can be handed to Gemini as "already found" and merged with its output; they are
+# tagged LOCAL_SOURCE so the UI and the EiC never present them as Gemini's.
+
+# Texts at or under this many words are scanned locally only, without calling Gemini
+LOCAL_ONLY_MAX_WORDS = int(os.getenv("MECCA_PREPASS_ONLY_WORDS", "50"))
+
+# Legitimate doubled words that the repeated-word rule must not flag
+_ALLOWED_REPEATS = {"had", "that", "is", "do", "bye", "ha", "no", "very", "so", "knock"}
+
+# (error type, reason, pattern, replacement). Patterns match the wrong text
+# exactly; replacement is applied to the match to produce the fix.
+_RULES = [
+    ("SPACING", "Spacing", re.compile(r"\b[\w'’]+ {2,}[\w'’]+\b"), lambda m: re.sub(r" {2,}", " ", m.group(0))),
+    ("SPACING", "Spacing",
+     re.compile(r"\b(to|of|in|on|at|by|for|from|with|and|the|said|told)([A-Z][a-z]+(?:['’]s)?)\b"),
+     lambda m: f"{m.group(1)} {m.group(2)}"),
+    ("SPACING", "Spacing", re.compile(r"\b([a-z]{2,}[,;!?])([A-Za-z]{2,})\b"), lambda m: f"{m.group(1)} {m.group(2)}"),
+    ("SPACING", "Spacing", re.compile(r"\b([a-z]{3,}\.)([A-Z][a-z]{2,})\b"), lambda m: f"{m.group(1)} {m.group(2)}"),
+    # A spaced colon before a number is a label or time ("Time : 10"), not an error
+    ("PUNCTUATION", "Punctuation", re.compile(r"\b(\w+) +([,;!?]|:(?!\s*\d))(\w*)"),
+     lambda m: f"{m.group(1)}{m.group(2)}" + (f" {m.group(3)}" if m.group(3) else "")),
+    ("PUNCTUATION", "Punctuation", re.compile(r"\b(\w+)([,;:])\2+"), lambda m: f"{m.group(1)}{m.group(2)}"),
+    ("PUNCTUATION", "Punctuation", re.compile(r"\b(\w+)\.\.(?!\.)"), lambda m: f"{m.group(1)}."),
+    ("WRONG_WORD", "Wrong Word", re.compile(r"\b(could|would|should|must|might) of\b", re.IGNORECASE),
+     lambda m: f"{m.group(1)} have"),
+    ("WRONG_WORD", "Wrong Word", re.compile(r"\b([Tt])heir (is|are|was|were)\b"), lambda m: f"{m.group(1)}here {m.group(2)}"),
+    ("WRONG_WORD", "Wrong Word", re.compile(r"\b([Yy])our welcome\b"), lambda m: f"{m.group(1)}ou're welcome"),
+    ("WRONG_WORD", "Wrong Word", re.compile(r"\b([Ii])ts (a|an|been)\b"), lambda m: f"{m.group(1)}t's {m.group(2)}"),
+    ("SPELLING", "Spelling", re.compile(r"\b([Aa])lot\b"), lambda m: f"{m.group(1)} lot"),
+]
+
+_REPEATED_WORD = re.compile(r"\b(\w+)\s+(\1)\b", re.IGNORECASE)
+
+def _in_link(text, position):
+    """True when position falls inside a URL, email address or file path"""
+    start = text.rfind(" ", 0, position) + 1
+    end = text.find(" ", position)
+    token = text[start:end if end != -1 else len(text)]
+    return "/" in token or "@" in token or token.lower().startswith("www.")
+
+def _scan_paragraph(number, paragraph):
+    records = []
+    for error_type, reason, pattern, fix in _RULES:
+        for match in pattern.finditer(paragraph):
+            if _in_link(paragraph, match.start()):
+                continue
+            records.append(ErrorRecord(number, error_type, match.group(0), fix(match), reason, LOCAL_SOURCE))
+
+    for match in _REPEATED_WORD.finditer(paragraph):
+        word = match.group(1)
+        # Capitalized repeats are usually names ("Walla Walla", "Sing Sing")
+        if word.lower() in _ALLOWED_REPEATS or word.isdigit() or word[0].isupper():
+            continue
+        records.append(ErrorRecord(number, "GRAMMAR", match.group(0), word, "Grammar", LOCAL_SOURCE))
+
+    return records
+
+def scan_mechanical_errors(article_text):
+    """Scan an article locally, returning an ErrorReport numbered like the chunker's paragraphs"""
+    records = []
+    for number, paragraph in enumerate(split_paragraphs(article_text), start=1):
+        records.extend(_scan_paragraph(number, paragraph))
+    return ErrorReport(list(dict.fromkeys(records)))
+
+def is_local_only(article_text):
+    """True when a text is short enough that the local pre-pass replaces the Gemini scan"""
+    return count_words(article_text) <= LOCAL_ONLY_MAX_WORDS
+
+def local_only_scan(report):
+    """The copy-editing response for a text too short to send to Gemini: the local findings, labelled as such"""
+    return f"{LOCAL_ONLY_NOTE}\n{report.to_text()}"
+
+def records_in_range(report, first_para, last_para):
+    """The part of a report that falls inside a paragraph range (for one article section)"""
+    return ErrorReport([record for record in report.records if first_para <= record.paragraph <= last_para])
+
+def with_local_findings(scan_fn, local_report, *args):
+    """
+    Run a Gemini scan (scan_fn(*args)) and merge its corrections with the local
+    pre-pass findings. Gemini corrections that repeat a local finding for the same
+    paragraph and text are dropped. A failed scan is returned unchanged.
+    """
+    result = scan_fn(*args)
+    if is_failure(result) or not local_report.records:
+        return result
+
+    gemini_report = parse_error_report(result)
+    if gemini_report is None:
+        return f"{local_report.to_text()}\n{result}"
+
+    already_found = {(record.paragraph, record.wrong.strip().lower()) for record in local_report.records}
+    new_records = [
+        record for record in gemini_report.records
+        if (record.paragraph, record.wrong.strip().lower()) not in already_found
+    ]
+    return combine_reports([local_report, ErrorReport(new_records, gemini_report.unparsed)]).to_text()
@@ -0,0 +1,96 @@
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from core.resilience import ProviderFailure, ProviderTimeout
+
+# One pool for the whole process so specialist calls from every session run side by side
+_specialist_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MECCA_SPECIALIST_WORKERS", "16")),
+    thread_name_prefix="mecca-specialist"
+)
+
+# Seconds to wait for each specialist before moving on without it. These bound
+# how long a review takes regardless of any provider's slow tail.
+# Override with MECCA_DEADLINE_<NAME> (e.g. MECCA_DEADLINE_CUSTOM_FCC) or MECCA_SPECIALIST_DEADLINE.
+DEFAULT_SPECIALIST_DEADLINE = float(os.getenv("MECCA_SPECIALIST_DEADLINE", "90"))
+SPECIALIST_DEADLINES = {
+    "gpt": 60,
+    "gemini": 45,
+    "custom_fcc": 75
+}
+
+def specialist_deadline(name):
+    """Deadline in seconds for a named specialist"""
+    override = os.getenv(f"MECCA_DEADLINE_{name.upper()}")
+    if override:
+        return float(override)
+    return SPECIALIST_DEADLINES.get(name, DEFAULT_SPECIALIST_DEADLINE)
+
+def dispatch_specialists(calls):
+    """
+    Start every specialist call at once.
+    `calls` maps a specialist name to (function, args); returns name -> Future.
+    """
+    # Each call carries the caller's context so the scheduler knows which session it belongs to
+    return {
+        name: _specialist_executor.submit(contextvars.copy_context().run, fn, *args)
+        for name, (fn, args) in calls.items()
+    }
+
+def _future_result(future):
+    try:
+        return future.result(timeout=0)
+    except Exception as e:
+        return ProviderFailure(f"Specialist Error: {str(e)}", e)
+
+def collect_available(futures, deadlines=None, default_deadline=None, started=None):
+    """
+    Wait for dispatched specialist calls, each against its own deadline, and
+    return (results, pending). Deadlines are measured from `started` (default:
+    now), so total wait is bounded by the slowest deadline rather than the sum.
+    A specialist that misses its deadline gets a timeout failure in `results`
+    and keeps running; its future is returned in `pending` for attach_late_results.
+    """
+    deadlines = deadlines or {}
+    started = time.monotonic() if started is None else started
+    results = {}
+    pending = {}
+
+    for name, future in futures.items():
+        deadline = deadlines.get(name, default_deadline or specialist_deadline(name))
+        remaining = max(0, started + deadline - time.monotonic())
+        try:
+            future.result(timeout=remaining)
+        except FuturesTimeout:
+            results[name] = ProviderFailure(
+                f"No response within {deadline:g} seconds - continuing without this specialist. "
+                "Its feedback will be attached here if it arrives late.",
+                ProviderTimeout(name, f"no response within {deadline:g} seconds")
+            )
+            pending[name] = future
+            continue
+        except Exception:
+            pass
+        results[name] = _future_result(future)
+
+    return results, pending
+
+def collect_specialists(futures, deadlines=None, default_deadline=None):
+    """Wait for dispatched specialist calls, each against its own deadline (late results are dropped)"""
+    results, _ = collect_available(futures, deadlines, default_deadline)
+    return results
+
+def attach_late_results(pending, results):
+    """
+    Move any pending specialists that have since finished into `results`.
+    Returns the names that were attached; they are removed from `pending`.
+    """
+    arrived = [name for name, future in pending.items() if future.done()]
+    for name in arrived:
+        results[name] = _future_result(pending.pop(name))
+    return arrived
+
+def run_specialists(calls, deadlines=None):
+    """Dispatch all specialist calls concurrently and collect their responses"""
+    return collect_specialists(dispatch_specialists(calls), deadlines)
@@ -0,0 +1,150 @@
+import os
+import re
+from core.tokens import count_tokens, has_local_tokenizer
+
+# Token-budget-aware prompt assembly. Prompt builders describe their prompt as
+# ordered sections with a priority; the assembler counts tokens for the target
+# model and, when the prompt is over budget, compresses and then drops the
+# lowest-priority sections until it fits. Required sections (priority 0) - the
+# core instructions, the writer's own guidance and the article - are never
+# touched: if they alone exceed the budget the prompt is sent whole and the
+# report says so, rather than anything being silently cut. The report also says
+# whether the prompt fits the model's context at all.
+
+# Default input budget (tokens) per target model; override with MECCA_PROMPT_BUDGET_<MODEL>.
+# This is a cost and latency target: above it the optional guidance is trimmed,
+# which saves a few hundred tokens at most. Long articles stay over it and are sent whole.
+PROMPT_TOKEN_BUDGETS = {
+    "gpt-4o": 12000,
+    "gemini": 12000,
+    "perplexity": 8000
+}
+DEFAULT_PROMPT_BUDGET = 12000
+
+# Most input tokens each target model can actually take: its context window less
+# the response it is asked for ("perplexity" prompts go to gpt-4o-mini in the Custom FCC).
+# A prompt over this would be rejected by the provider, which is what the report warns about.
+MODEL_INPUT_LIMITS = {
+    "gpt-4o": 128000 - 2000,
+    "gemini": 2000000 - 2000,
+    "perplexity": 128000 - 1500
+}
+DEFAULT_INPUT_LIMIT = 128000 - 2000
+
+class PromptSection:
+    """One named piece of a prompt. Higher priority numbers are trimmed first; 0 means required."""
+
+    __slots__ = ("name", "text", "priority", "droppable")
+
+    def __init__(self, name, text, priority=0, droppable=False):
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.droppable = droppable
+
+class AssembledPrompt(str):
+    """
+    The assembled prompt text. It is an ordinary string everywhere it is used;
+    `.report` describes the budget, per-section token counts and any trimming.
+    """
+
+    def __new__(cls, text, report):
+        prompt = super().__new__(cls, text)
+        prompt.report = report
+        return prompt
+
+def prompt_budget(model):
+    override = os.getenv(f"MECCA_PROMPT_BUDGET_{model.upper().replace('-', '_')}")
+    return int(override) if override else PROMPT_TOKEN_BUDGETS.get(model, DEFAULT_PROMPT_BUDGET)
+
+def input_limit(model):
+    return MODEL_INPUT_LIMITS.get(model, DEFAULT_INPUT_LIMIT)
+
+def compress_section(text):
+    """Strip indentation, blank lines and repeated spaces - same instructions, fewer tokens"""
+    lines = [re.sub(r"[ \t]{2,}", " ", line.strip()) for line in text.splitlines()]
+    compressed = "\n".join(line for line in lines if line)
+    # Keep the separation from the neighbouring sections
+    return f"\n{compressed}\n\n" if compressed else ""
+
+def assemble_prompt(sections, model, budget=None):
+    """Join sections in order, trimming lower-priority ones to fit the model's token budget"""
+    budget = budget or prompt_budget(model)
+    texts = {section.name: section.text for section in sections}
+    original_tokens = {section.name: count_tokens(section.text, model) for section in sections}
+    tokens = dict(original_tokens)
+    actions = {}
+
+    def total():
+        return sum(tokens.values())
+
+    trimmable = sorted((s for s in sections if s.priority > 0 and s.text.strip()), key=lambda s: -s.priority)
+
+    # If even full trimming cannot reach the budget, trimming would only lose guidance - send it whole
+    if total() > budget:
+        smallest = sum(
+            0 if section.droppable else (
+                min(tokens[section.name], count_tokens(compress_section(section.text), model)) if section.priority else tokens[section.name]
+            )
+            for section in sections
+        )
+        if smallest > budget:
+            trimmable = []
+
+    # First pass: compress, lowest priority first
+    for section in trimmable:
+        if total() <= budget:
+            break
+        compressed = compress_section(texts[section.name])
+        compressed_tokens = count_tokens(compressed, model)
+        if compressed_tokens < tokens[section.name]:
+            texts[section.name] = compressed
+            tokens[section.name] = compressed_tokens
+            actions[section.name] = "compressed"
+
+    # Second pass: drop optional sections, lowest priority first
+    for section in trimmable:
+        if total() <= budget:
+            break
+        if section.droppable and tokens[section.name]:
+            texts[section.name] = ""
+            tokens[section.name] = 0
+            actions[section.name] = "dropped"
+
+    report = {
+        "model": model,
+        "budget": budget,
+        "total_tokens": total(),
+        "original_tokens": sum(original_tokens.values()),
+        "over_budget": total() > budget,
+        "input_limit": input_limit(model),
+        "over_limit": total() > input_limit(model),
+        "exact": has_local_tokenizer(model),
+        "sections": [
+            {
+                "name": section.name,
+                "tokens": tokens[section.name],
+                "original_tokens": original_tokens[section.name],
+                "action": actions.get(section.name, "kept")
+            }
+            for section in sections
+        ]
+    }
+    return AssembledPrompt("".join(texts[section.name] for section in sections), report)
+
+def prompt_reports(specialist_calls):
+    """
+    Budget report per specialist from a {name: (fn, args)} dispatch map. For a
+    review split into sections, the largest section's report is used.
+    """
+    reports = {}
+    for name, (_, args) in specialist_calls.items():
+        prompts = []
+        for arg in args:
+            if isinstance(arg, AssembledPrompt):
+                prompts.append(arg)
+            elif isinstance(arg, list):
+                prompts.extend(item[-1] for item in arg if isinstance(item, tuple) and isinstance(item[-1], AssembledPrompt))
+        if prompts:
+            reports[name] = max((prompt.report for prompt in prompts), key=lambda report: report["total_tokens"])
+    return reports
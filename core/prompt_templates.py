@@ -0,0 +1,85 @@
+import re
+import threading
+from core.prompt_budget import PromptSection
+
+# Precompiled prompt templates. A prompt builder runs once per static key - the
+# model, editorial role, writer role and mode - with placeholder markers in its
+# per-request slots (article text, custom guidance, specialist responses). The
+# output is split at the markers into literal parts, so each request only joins
+# those parts with its values instead of rebuilding every role dict and f-string.
+# Builders put their slots after the static scaffolding where the prompt allows,
+# so requests with the same key share a long identical prefix - the part
+# provider-side prompt caching can reuse.
+
+_SLOT_PATTERN = re.compile("\x00([a-z_]+)\x00")
+
+def slot(name):
+    """Placeholder for a per-request value in a template builder's output"""
+    return f"\x00{name}\x00"
+
+class CompiledTemplate:
+    """Literal text parts with the named slots that go between them"""
+
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, text):
+        pieces = _SLOT_PATTERN.split(text)
+        self.parts = tuple(pieces[0::2])
+        self.slots = tuple(pieces[1::2])
+
+    @property
+    def prefix(self):
+        """The static text before the first slot"""
+        return self.parts[0]
+
+    def render(self, values):
+        pieces = [self.parts[0]]
+        for name, part in zip(self.slots, self.parts[1:]):
+            pieces.append(values[name])
+            pieces.append(part)
+        return "".join(pieces)
+
+def compile_template(built):
+    """Compile a builder's output: prompt text, or a list of PromptSections"""
+    if isinstance(built, str):
+        return CompiledTemplate(built)
+    return tuple(
+        PromptSection(section.name, CompiledTemplate(section.text), section.priority, section.droppable)
+        for section in built
+    )
+
+def render_sections(compiled_sections, values):
+    """PromptSections for one request, ready for assemble_prompt"""
+    return [
+        PromptSection(section.name, section.text.render(values), section.priority, section.droppable)
+        for section in compiled_sections
+    ]
+
+class TemplateRegistry:
+    """Compiled templates by (kind, static key), built on first use and shared across sessions"""
+
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key, build):
+        """The compiled template for build(*key), building it the first time this key is seen"""
+        templates = self._templates.get((kind, key))
+        if templates is None:
+            compiled = compile_template(build(*key))
+            with self._lock:
+                templates = self._templates.setdefault((kind, key), compiled)
+        return templates
+
+    def items(self):
+        """((kind, key), template) pairs for every compiled template"""
+        return list(self._templates.items())
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self):
+        return len(self._templates)
+
+prompt_templates = TemplateRegistry()
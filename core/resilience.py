@@ -0,0 +1,259 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from core.scheduler import AsyncProviderSlot, provider_slot
+
+# Shared resilience policy for every provider call: per-provider timeouts,
+# jittered exponential backoff on rate limits and server errors, and a circuit
+# breaker that stops calling a provider that keeps failing.
+
+PROVIDER_TIMEOUTS = {
+    "openai": 60,
+    "anthropic": 90,
+    "google": 60,
+    "perplexity": 60,
+    "google_search": 10
+}
+
+MAX_ATTEMPTS = int(os.getenv("MECCA_MAX_ATTEMPTS", "3"))
+BACKOFF_BASE_SECONDS = float(os.getenv("MECCA_BACKOFF_BASE_SECONDS", "1.0"))
+BACKOFF_MAX_SECONDS = float(os.getenv("MECCA_BACKOFF_MAX_SECONDS", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("MECCA_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("MECCA_CIRCUIT_RESET_SECONDS", "30"))
+
+def provider_timeout(provider):
+    """Request timeout in seconds for a provider (override with MECCA_TIMEOUT_<PROVIDER>)"""
+    override = os.getenv(f"MECCA_TIMEOUT_{provider.upper()}")
+    return float(override) if override else PROVIDER_TIMEOUTS.get(provider, 60)
+
+class ProviderError(Exception):
+    """A provider call failed; `retryable` marks transient failures"""
+    retryable = False
+
+    def __init__(self, provider, message, status_code=None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+
+class ProviderTimeout(ProviderError):
+    """The provider did not answer within its timeout"""
+    retryable = True
+
+class ProviderRateLimited(ProviderError):
+    """The provider returned 429 / quota exhausted"""
+    retryable = True
+
+class ProviderUnavailable(ProviderError):
+    """Server error (5xx) or connection failure"""
+    retryable = True
+
+class ProviderRequestError(ProviderError):
+    """Non-retryable client error such as bad credentials or an invalid request"""
+
+class CircuitOpenError(ProviderError):
+    """The provider's circuit breaker is open, so the call was not attempted"""
+
+class ProviderFailure(str):
+    """
+    A failed specialist result. It is still a string, so existing displays show
+    the error message unchanged, but callers can tell it apart from real content
+    with is_failure() and inspect the underlying error.
+    """
+
+    def __new__(cls, message, error=None):
+        failure = super().__new__(cls, message)
+        failure.error = error
+        return failure
+
+def is_failure(result):
+    """True when a call_* result is an error rather than model content"""
+    return isinstance(result, ProviderFailure)
+
+def _status_code(exc):
+    """Pull an HTTP status out of the various SDK exception shapes"""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+# Exception names of dropped connections and broken responses (requests, httpx, the SDKs)
+_TRANSIENT_NAMES = ("connect", "readerror", "writeerror", "protocol", "unavailable")
+
+def _is_transport_error(exc, name):
+    """A connection-level failure: any httpx.TransportError subclass, or a name that says so"""
+    if any(cls.__name__ == "TransportError" for cls in type(exc).__mro__):
+        return True
+    return any(part in name for part in _TRANSIENT_NAMES)
+
+def classify_exception(provider, exc):
+    """Map an SDK / HTTP exception onto the typed ProviderError hierarchy"""
+    if isinstance(exc, ProviderError):
+        return exc
+
+    message = str(exc) or exc.__class__.__name__
+    name = exc.__class__.__name__.lower()
+    status = _status_code(exc)
+
+    if "timeout" in name or isinstance(exc, TimeoutError):
+        return ProviderTimeout(provider, message, status)
+    if status == 429 or "ratelimit" in name or "resourceexhausted" in name:
+        return ProviderRateLimited(provider, message, status)
+    if (status is not None and status >= 500) or _is_transport_error(exc, name):
+        return ProviderUnavailable(provider, message, status)
+    return ProviderRequestError(provider, message, status)
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures; lets one trial call through after a cool-down"""
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may be attempted now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Half-open: allow a trial call; a failure re-opens immediately
+                self.opened_at = None
+                self.consecutive_failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(provider):
+    """Process-wide circuit breaker for a provider"""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker()
+            _breakers[provider] = breaker
+        return breaker
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+def call_with_resilience(provider, fn, *args, scheduled_tokens=0, **kwargs):
+    """
+    Call fn under the provider's resilience policy. Each attempt first waits for
+    a slot from the provider scheduler (`scheduled_tokens` is the estimated
+    token cost). Transient failures are retried with jittered backoff; anything
+    that still fails is raised as a ProviderError subclass.
+    """
+    def attempt():
+        with provider_slot(provider, scheduled_tokens):
+            return fn(*args, **kwargs)
+
+    return _retry(provider, attempt)
+
+def _retry(provider, attempt):
+    """Run attempt() under the provider's circuit breaker, retrying transient failures"""
+    breaker = get_circuit_breaker(provider)
+
+    for attempt_number in range(MAX_ATTEMPTS):
+        if not breaker.allow():
+            raise CircuitOpenError(
+                provider,
+                f"{provider} is temporarily disabled after repeated failures - retrying in up to {breaker.reset_seconds:g} seconds"
+            )
+
+        try:
+            result = attempt()
+        except Exception as exc:
+            error = classify_exception(provider, exc)
+            if not error.retryable:
+                raise error from exc
+
+            breaker.record_failure()
+            if attempt_number == MAX_ATTEMPTS - 1:
+                raise error from exc
+            time.sleep(backoff_delay(attempt_number))
+            continue
+
+        breaker.record_success()
+        return result
+
+async def acall_with_resilience(provider, coro_fn, *args, scheduled_tokens=0, **kwargs):
+    """Async counterpart of call_with_resilience; shares the same circuit breakers"""
+    breaker = get_circuit_breaker(provider)
+
+    for attempt in range(MAX_ATTEMPTS):
+        if not breaker.allow():
+            raise CircuitOpenError(
+                provider,
+                f"{provider} is temporarily disabled after repeated failures - retrying in up to {breaker.reset_seconds:g} seconds"
+            )
+
+        try:
+            async with AsyncProviderSlot(provider, scheduled_tokens):
+                result = await coro_fn(*args, **kwargs)
+        except Exception as exc:
+            error = classify_exception(provider, exc)
+            if not error.retryable:
+                raise error from exc
+
+            breaker.record_failure()
+            if attempt == MAX_ATTEMPTS - 1:
+                raise error from exc
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        breaker.record_success()
+        return result
+
+class _SlotHoldingStream:
+    """An SDK stream manager that keeps the provider's scheduler slot until it is exited"""
+
+    def __init__(self, manager, slot):
+        self.manager = manager
+        self.slot = slot
+
+    def __exit__(self, *exc_info):
+        try:
+            return self.manager.__exit__(*exc_info)
+        finally:
+            self.slot.__exit__(None, None, None)
+
+def open_stream_with_resilience(provider, open_stream, scheduled_tokens=0):
+    """
+    Open a streaming response under the resilience policy. `open_stream` returns
+    an SDK stream manager; connection-time failures are retried, but once tokens
+    start flowing the stream is not restarted. Returns (manager, stream); the
+    caller must call manager.__exit__ when done. The scheduler slot is held until
+    then, so a stream counts against the provider's concurrency cap while it is read.
+    """
+    def enter():
+        slot = provider_slot(provider, scheduled_tokens)
+        slot.__enter__()
+        try:
+            manager = open_stream()
+            stream = manager.__enter__()
+        except BaseException:
+            slot.__exit__(None, None, None)
+            raise
+        return _SlotHoldingStream(manager, slot), stream
+
+    return _retry(provider, enter)
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Persistent, content-addressed cache for model responses.
+# Identical requests (same provider, model, prompt and sampling settings) are
+# answered from a local SQLite file instead of paying for another API call.
+
+DEFAULT_CACHE_PATH = os.getenv("MECCA_CACHE_PATH", ".mecca_cache.sqlite3")
+DEFAULT_TTL_SECONDS = int(os.getenv("MECCA_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("MECCA_CACHE_MAX_ENTRIES", "5000"))
+CACHE_ENABLED = os.getenv("MECCA_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+def make_cache_key(provider, model, prompt, temperature, max_tokens):
+    """Hash of everything that determines a model's output"""
+    payload = json.dumps(
+        [provider, model, prompt, temperature, max_tokens],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """SQLite-backed key/value cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES, table="responses"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table} (last_access)")
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def put(self, key, value):
+        """Store a value and evict least-recently-used entries beyond the cap"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+class _DisabledCache:
+    """Stand-in used when caching is switched off"""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_named_cache(table, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+    """Process-wide cache stored in its own table of the shared cache file"""
+    with _caches_lock:
+        cache = _caches.get(table)
+        if cache is None:
+            if CACHE_ENABLED:
+                cache = ResponseCache(ttl_seconds=ttl_seconds, max_entries=max_entries, table=table)
+            else:
+                cache = _DisabledCache()
+            _caches[table] = cache
+        return cache
+
+def get_response_cache():
+    """Process-wide model response cache"""
+    return get_named_cache("responses")
@@ -0,0 +1,247 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Process-wide request scheduler. Every provider call takes a slot here first:
+# per-provider token buckets keep us under requests/tokens-per-minute limits,
+# a concurrency cap bounds in-flight calls, interactive dialogue turns are
+# served before batch reviews, and sessions at the same priority take turns
+# so one student's burst cannot starve everyone else.
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# (requests per minute, tokens per minute, max concurrent); 0 disables a limit.
+# Override with MECCA_RPM_<PROVIDER>, MECCA_TPM_<PROVIDER>, MECCA_CONCURRENCY_<PROVIDER>.
+PROVIDER_LIMITS = {
+    "openai": (500, 300000, 32),
+    "anthropic": (50, 40000, 16),
+    "google": (150, 2000000, 32),
+    "perplexity": (50, 0, 8),
+    "google_search": (100, 0, 16)
+}
+
+# How often a queued caller re-checks when it is not yet at the head of the queue
+QUEUE_POLL_SECONDS = 0.25
+
+_request_context = contextvars.ContextVar("mecca_request_context", default=("shared", PRIORITY_BATCH))
+
+@contextmanager
+def request_context(session_id, priority=PRIORITY_BATCH):
+    """Attribute provider calls made inside this block to a session and priority"""
+    token = _request_context.set((session_id, priority))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+def current_request_context():
+    """(session_id, priority) for calls made from the current context"""
+    return _request_context.get()
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute's allowance"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.refill_per_second = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def time_until(self, amount):
+        """Seconds until `amount` can be taken (0 when unlimited or available now)"""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+class _Ticket:
+    __slots__ = ("session_id", "priority", "tokens", "enqueued_at")
+
+    def __init__(self, session_id, priority, tokens):
+        self.session_id = session_id
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+
+class ProviderScheduler:
+    """Fair, prioritized admission control for one provider"""
+
+    def __init__(self, provider, requests_per_minute, tokens_per_minute, max_concurrent):
+        self.provider = provider
+        self.max_concurrent = max_concurrent
+        self._condition = threading.Condition()
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        # priority -> session_id -> deque of tickets; session order is the round-robin order
+        self._queues = {PRIORITY_INTERACTIVE: OrderedDict(), PRIORITY_BATCH: OrderedDict()}
+        self._in_flight = 0
+        self._granted = 0
+        self._recent_waits = deque(maxlen=500)
+
+    def _head(self):
+        for priority in sorted(self._queues):
+            for tickets in self._queues[priority].values():
+                return tickets[0]
+        return None
+
+    def _remove(self, ticket):
+        sessions = self._queues[ticket.priority]
+        tickets = sessions.get(ticket.session_id)
+        if not tickets or ticket not in tickets:
+            return
+        tickets.remove(ticket)
+        if tickets:
+            # Session still has work queued - send it to the back of the rotation
+            sessions.move_to_end(ticket.session_id)
+        else:
+            del sessions[ticket.session_id]
+
+    def enqueue(self, session_id, priority, tokens):
+        ticket = _Ticket(session_id, priority if priority in self._queues else PRIORITY_BATCH, tokens)
+        with self._condition:
+            self._queues[ticket.priority].setdefault(session_id, deque()).append(ticket)
+        return ticket
+
+    def poll(self, ticket):
+        """Try to admit a queued ticket; returns 0 when admitted, else seconds to wait before retrying"""
+        with self._condition:
+            if self._head() is not ticket:
+                return QUEUE_POLL_SECONDS
+            if self.max_concurrent and self._in_flight >= self.max_concurrent:
+                return QUEUE_POLL_SECONDS
+
+            wait = max(self._request_bucket.time_until(1), self._token_bucket.time_until(ticket.tokens))
+            if wait > 0:
+                return wait
+
+            self._request_bucket.take(1)
+            self._token_bucket.take(ticket.tokens)
+            self._in_flight += 1
+            self._granted += 1
+            self._recent_waits.append(time.monotonic() - ticket.enqueued_at)
+            self._remove(ticket)
+            self._condition.notify_all()
+            return 0.0
+
+    def wait_for_turn(self, ticket, timeout):
+        """Block until poll() might succeed or a slot is released"""
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def cancel(self, ticket):
+        with self._condition:
+            self._remove(ticket)
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            waits = sorted(self._recent_waits)
+            by_priority = {
+                priority: sum(len(tickets) for tickets in sessions.values())
+                for priority, sessions in self._queues.items()
+            }
+            return {
+                "queue_depth": sum(by_priority.values()),
+                "queued_interactive": by_priority[PRIORITY_INTERACTIVE],
+                "queued_batch": by_priority[PRIORITY_BATCH],
+                "queued_sessions": len({s for sessions in self._queues.values() for s in sessions}),
+                "in_flight": self._in_flight,
+                "granted": self._granted,
+                "avg_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait_seconds": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "max_wait_seconds": waits[-1] if waits else 0.0
+            }
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def _limit(name, provider, default):
+    override = os.getenv(f"MECCA_{name}_{provider.upper()}")
+    return int(override) if override else default
+
+def get_provider_scheduler(provider):
+    """Process-wide scheduler for a provider"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            rpm, tpm, concurrency = PROVIDER_LIMITS.get(provider, (0, 0, 16))
+            scheduler = ProviderScheduler(
+                provider,
+                _limit("RPM", provider, rpm),
+                _limit("TPM", provider, tpm),
+                _limit("CONCURRENCY", provider, concurrency)
+            )
+            _schedulers[provider] = scheduler
+        return scheduler
+
+@contextmanager
+def provider_slot(provider, tokens=0):
+    """Wait for this provider to admit a call from the current session, holding the slot for the block"""
+    scheduler = get_provider_scheduler(provider)
+    session_id, priority = current_request_context()
+    ticket = scheduler.enqueue(session_id, priority, tokens)
+    try:
+        while True:
+            wait = scheduler.poll(ticket)
+            if wait == 0:
+                break
+            scheduler.wait_for_turn(ticket, wait)
+    except BaseException:
+        scheduler.cancel(ticket)
+        raise
+
+    try:
+        yield
+    finally:
+        scheduler.release()
+
+class AsyncProviderSlot:
+    """`async with` counterpart of provider_slot for the background event loop"""
+
+    def __init__(self, provider, tokens=0):
+        self.scheduler = get_provider_scheduler(provider)
+        self.tokens = tokens
+
+    async def __aenter__(self):
+        session_id, priority = current_request_context()
+        ticket = self.scheduler.enqueue(session_id, priority, self.tokens)
+        try:
+            while True:
+                wait = self.scheduler.poll(ticket)
+                if wait == 0:
+                    return self
+                await asyncio.sleep(min(wait, QUEUE_POLL_SECONDS))
+        except BaseException:
+            self.scheduler.cancel(ticket)
+            raise
+
+    async def __aexit__(self, *exc_info):
+        self.scheduler.release()
+
+def get_scheduler_stats():
+    """Queue depth, in-flight calls and wait times for every provider seen so far"""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return {scheduler.provider: scheduler.stats() for scheduler in schedulers}
@@ -1,43 +1,165 @@
+import re
+import uuid
 import streamlit as st
+from core.analysis_store import STORE_ENABLED, SessionCache, get_analysis_store
+from core.error_records import parse_error_report
+from core.resilience import is_failure
+from core.session_records import DIALOGUE_HISTORY_CAP, VALIDATION_HISTORY_CAP, DialogueExchange, SpillList, ValidationRecord
+
+# Analysis results and dialogue live in a per-session record that is persisted
+# to the analysis store (core.analysis_store) under the session ID, loaded lazily
+# and evicted from memory when idle. UI state, widget values and in-flight work
+# (futures) stay in st.session_state. SessionView puts both behind the familiar
+# session_state interface.
+
+def _spill_cap(cap):
+    # Without a store, entries dropped from memory could not be read back
+    return cap if STORE_ENABLED else None
+
+def _new_analysis_fields():
+    """Defaults for a session with no analysis yet"""
+    return {
+        # Article or story text and the form context it was reviewed with
+        'content_mode': None,
+        'original_article': "",
+        'context': {},
+
+        # Track if we have analysis results to display
+        'has_analysis': False,
+
+        # Individual editor responses, the EiC summary and report details
+        'editor_responses': {},
+        'eic_summary': "",
+        'eic_token_report': None,
+        'prompt_reports': {},
+
+        # Specialists whose feedback arrived after the EiC synthesis
+        'late_specialists': [],
+
+        # Dialogue exchanges (DialogueExchange) and their validation (ValidationRecord, by exchange ID).
+        # Only the newest of each stay in memory; the rest are in the store.
+        'dialogue_history': SpillList(cap=_spill_cap(DIALOGUE_HISTORY_CAP)),
+        'validation_history': SpillList(cap=_spill_cap(VALIDATION_HISTORY_CAP)),
+
+        # Running summary of dialogue exchanges that are no longer replayed word for word
+        'dialogue_summary': "",
+        'dialogue_summarized_count': 0,
+
+        # Dialogue system prompt, built once per analysis so it stays byte-identical across turns
+        'dialogue_system_prompt': "",
+
+        # Parsed Gemini corrections (core.error_records.ErrorReport), or None if unavailable
+        'gemini_errors': None,
+
+        # Specialist responses prepared for dialogue quote checks, built once per analysis
+        'quote_matcher': None
+    }
+
+# Appended to turn by turn, so the store saves only the new entries
+_LIST_FIELDS = ('dialogue_history', 'validation_history')
+
+# Rebuilt from the other fields, so never written to the store
+_TRANSIENT_FIELDS = ('dialogue_system_prompt', 'gemini_errors', 'quote_matcher')
+
+ANALYSIS_FIELDS = frozenset(_new_analysis_fields())
+
+def _rebuild_derived_fields(fields):
+    """Recreate records and transient fields of an analysis resumed from the store"""
+    fields['dialogue_history'][:] = [DialogueExchange.from_dict(entry) for entry in fields['dialogue_history']]
+    fields['validation_history'][:] = [ValidationRecord.from_dict(entry) for entry in fields['validation_history']]
+    
+    gemini_response = fields['editor_responses'].get("gemini")
+    if fields['content_mode'] == "article" and gemini_response and not is_failure(gemini_response):
+        fields['gemini_errors'] = parse_error_report(gemini_response)
+
+_session_cache = SessionCache(
+    get_analysis_store(),
+    _new_analysis_fields,
+    _LIST_FIELDS,
+    _TRANSIENT_FIELDS,
+    on_load=_rebuild_derived_fields,
+    # Without a store to write back to, evicting would lose the analysis
+    **({} if STORE_ENABLED else {"idle_seconds": None, "max_sessions": 0})
+)
+
+class SessionView:
+    """
+    st.session_state with the analysis fields routed to the session's record.
+    Supports the same attribute access, get() and `in` as st.session_state.
+    """
+
+    __slots__ = ("_state",)
+
+    def __init__(self, state):
+        object.__setattr__(self, "_state", state)
+
+    def _fields(self):
+        return _session_cache.get(self._state.session_id).fields
+
+    def __getattr__(self, name):
+        if name in ANALYSIS_FIELDS:
+            return self._fields()[name]
+        return getattr(self._state, name)
+
+    def __setattr__(self, name, value):
+        if name in ANALYSIS_FIELDS:
+            _session_cache.set_field(self._state.session_id, name, value)
+        else:
+            setattr(self._state, name, value)
+
+    def get(self, name, default=None):
+        if name in ANALYSIS_FIELDS:
+            return self._fields().get(name, default)
+        return self._state.get(name, default)
+
+    def __contains__(self, name):
+        return name in ANALYSIS_FIELDS or name in self._state
+
+_SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+def _resume_session_id():
+    """Session ID from the page URL, so a reconnecting writer gets their analysis back"""
+    session_id = st.query_params.get("session", "")
+    return session_id if _SESSION_ID_PATTERN.match(session_id) else None
 
 def initialize_session_state():
     """Initialize all session state variables for MECCA"""
-    
-    # Initialize dialogue history
-    if 'dialogue_history' not in st.session_state:
-        st.session_state.dialogue_history = []
-    
-    # Initialize article storage
-    if 'original_article' not in st.session_state:
-        st.session_state.original_article = ""
-    
-    # Initialize EiC summary
-    if 'eic_summary' not in st.session_state:
-        st.session_state.eic_summary = ""
-    
-    # Initialize context
-    if 'context' not in st.session_state:
-        st.session_state.context = {}
-    
-    # Track if we have analysis results to display
-    if 'has_analysis' not in st.session_state:
-        st.session_state.has_analysis = False
-    
-    # Store individual editor responses
-    if 'editor_responses' not in st.session_state:
-        st.session_state.editor_responses = {}
-    
-    # Store validation history
-    if 'validation_history' not in st.session_state:
-        st.session_state.validation_history = []
-    
+
+    # Identifies this browser session to the analysis store and the shared provider scheduler
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = _resume_session_id() or uuid.uuid4().hex
+    if st.query_params.get("session") != st.session_state.session_id:
+        st.query_params["session"] = st.session_state.session_id
+
+    # Specialists that missed their deadline (name -> Future)
+    if 'pending_specialists' not in st.session_state:
+        st.session_state.pending_specialists = {}
+
+    # Background dialogue summary update, if one is running
+    if 'dialogue_summary_job' not in st.session_state:
+        st.session_state.dialogue_summary_job = None
+
     # EiC view mode for toggle (keeping for backward compatibility)
     if 'eic_view_mode' not in st.session_state:
         st.session_state.eic_view_mode = 'full'
 
+    # Write back and evict sessions that have gone idle
+    _session_cache.sweep()
+
+def get_session():
+    """The current session: st.session_state plus this session's analysis record"""
+    return SessionView(st.session_state)
+
+def save_session():
+    """Persist the current session's analysis and any new dialogue"""
+    _session_cache.save(st.session_state.session_id)
+
+def session_memory_report():
+    """Approximate memory of the sessions in this server process, with the current session's breakdown"""
+    return _session_cache.memory_report(st.session_state.session_id)
+
 def reset_analysis_state():
     """Reset session state for new analysis"""
-    st.session_state.dialogue_history = []
-    st.session_state.has_analysis = False
-    st.session_state.editor_responses = {}
-    st.session_state.validation_history = []
+    _session_cache.reset(st.session_state.session_id)
+    st.session_state.pending_specialists = {}
+    st.session_state.dialogue_summary_job = None
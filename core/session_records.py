@@ -0,0 +1,111 @@
+import os
+import sys
+
+# Compact records for the dialogue kept in a session. Each answer is held once,
+# in its DialogueExchange; a ValidationRecord points at the exchange by ID rather
+# than copying the question, answer and quote attributions. Records use
+# __slots__ and read like the dicts they replace (exchange["answer"]).
+
+# Validation records kept in memory per session; older ones stay in the analysis store
+VALIDATION_HISTORY_CAP = int(os.getenv("MECCA_VALIDATION_HISTORY_CAP", "20"))
+
+# Dialogue exchanges kept in memory per session - comfortably more than are replayed
+# each turn (core.dialogue_history); older ones are read back from the store when shown
+DIALOGUE_HISTORY_CAP = int(os.getenv("MECCA_DIALOGUE_HISTORY_CAP", "12"))
+
+class _Record:
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+class DialogueExchange(_Record):
+    """One question and answer in the Ask the Editor dialogue. `id` is its position in the history."""
+
+    __slots__ = ("id", "question", "answer", "usage", "quotes")
+
+    def __init__(self, id, question, answer, usage=None, quotes=None):
+        self.id = id
+        self.question = question
+        self.answer = answer
+        self.usage = usage
+        self.quotes = quotes or []
+
+class ValidationRecord(_Record):
+    """Validation flags for the dialogue answer with this exchange ID"""
+
+    __slots__ = ("exchange_id", "flags", "timestamp")
+
+    def __init__(self, exchange_id, flags, timestamp):
+        self.exchange_id = exchange_id
+        self.flags = flags
+        self.timestamp = timestamp
+
+class SpillList(list):
+    """
+    A list whose oldest entries are dropped from memory once they are in the
+    analysis store. `offset` counts the dropped entries, so an entry's position
+    in the full list is offset + its index here. `fetch(start, stop)` reads
+    dropped entries back from the store (as dicts).
+    """
+
+    __slots__ = ("offset", "cap", "fetch")
+
+    def __init__(self, items=(), cap=None, offset=0):
+        super().__init__(items)
+        self.cap = cap
+        self.offset = offset
+        self.fetch = None
+
+def full_length(entries):
+    """Length of a list including any entries dropped from memory"""
+    return getattr(entries, "offset", 0) + len(entries)
+
+def entries_from(entries, start):
+    """Entries from position `start` of the full list on, reading dropped ones back from the store"""
+    offset = getattr(entries, "offset", 0)
+    if start >= offset:
+        return list(entries[start - offset:])
+    older = entries.fetch(start, offset) if entries.fetch else []
+    return older + list(entries)
+
+def append_exchange(dialogue_history, question, answer, usage=None, quotes=None):
+    """Add an answered question to the dialogue history and return it"""
+    exchange = DialogueExchange(full_length(dialogue_history), question, answer, usage, quotes)
+    dialogue_history.append(exchange)
+    return exchange
+
+def deep_size(obj, seen=None):
+    """Approximate memory held by an object and everything it references, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if not name.startswith("__") and hasattr(obj, name):
+                size += deep_size(getattr(obj, name), seen)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
@@ -0,0 +1,54 @@
+# Lightweight token accounting for prompt sizing and reporting
+
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional - counts fall back to the character estimate
+    tiktoken = None
+
+# Average characters per token for English prose across the providers MECCA uses
+CHARS_PER_TOKEN = 4
+
+# Local tokenizer per target model. OpenAI models use their own encoding; Claude
+# and Gemini tokenizers are not available offline, so the closest OpenAI encoding
+# stands in for them (within a few percent on English prose).
+MODEL_ENCODINGS = {
+    "gpt-4o": "o200k_base",
+    "gpt-4o-mini": "o200k_base",
+    "perplexity": "o200k_base",
+    "claude": "cl100k_base",
+    "gemini": "cl100k_base"
+}
+
+def estimate_tokens(text):
+    """Approximate token count for a piece of text"""
+    if not text:
+        return 0
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+@lru_cache(maxsize=None)
+def _encoding(name):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Encoding files are fetched on first use; offline we keep estimating
+        return None
+
+def count_tokens(text, model=None):
+    """
+    Token count for `text` as the target model would see it, using tiktoken when
+    installed and falling back to estimate_tokens otherwise.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(MODEL_ENCODINGS.get(model, "o200k_base"))
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def has_local_tokenizer(model=None):
+    """Whether count_tokens is exact for this model's encoding rather than estimated"""
+    return _encoding(MODEL_ENCODINGS.get(model, "o200k_base")) is not None
@@ -1,9 +1,35 @@
 # Add this to your temp_forms.py or create a new file: custom_fcc.py
 
+import contextvars
+import os
+import threading
+import time
 import requests
 import openai
 import streamlit as st
 import json
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
+from core.clients import get_openai_client, get_http_session
+from core.response_cache import get_named_cache, get_response_cache, make_cache_key
+from core.resilience import ProviderFailure, call_with_resilience, provider_timeout
+from core.tokens import estimate_tokens
+
+# Number of claims searched per analysis - searches run concurrently, so raising
+# this adds quota cost but not proportional latency
+MAX_SEARCH_QUERIES = int(os.getenv("MECCA_FCC_MAX_SEARCHES", "2"))
+
+# Shared deadline (seconds) for the whole batch of claim searches
+SEARCH_DEADLINE_SECONDS = float(os.getenv("MECCA_FCC_SEARCH_DEADLINE", "12"))
+
+# Dedicated pool so claim searches never wait behind specialist calls
+_search_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mecca-fcc-search")
+
+# How long (seconds) a Google Custom Search result is reused for the same query
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("MECCA_SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Searches currently on the wire, so identical concurrent queries share one request
+_inflight_searches = {}
+_inflight_lock = threading.Lock()
 
 def call_custom_fact_checking_coach(prompt, openai_key, search_api_key, search_engine_id):
     """
@@ -11,12 +37,19 @@ def call_custom_fact_checking_coach(prompt, openai_key, search_api_key, search_e
     Focuses on verification methodology coaching, not definitive fact-checking
     """
     if not openai_key or not search_api_key or not search_engine_id:
-        return "Custom Fact-Checking Coach configuration incomplete. Please check API keys and Search Engine ID."
+        return ProviderFailure("Custom Fact-Checking Coach configuration incomplete. Please check API keys and Search Engine ID.")
     
     try:
-        client = openai.OpenAI(api_key=openai_key)
+        # Serve repeat analyses from the response cache (entries expire with the cache TTL, so searches stay reasonably fresh)
+        cache = get_response_cache()
+        cache_key = make_cache_key("custom_fcc", "gpt-4o-mini", prompt, 0.3, 1500)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        client = get_openai_client(openai_key)
         
-        # Step 1: Extract key claims for verification
+        # Step 1: Extract key claims for verification as structured records
         claim_extraction_prompt = f"""You are a verification methodology coach. Analyze this content and identify key factual claims that should be verified.
 
 Focus on claims that are:
@@ -28,55 +61,46 @@ For each claim, provide:
 1. The exact claim
 2. Why it needs verification
 3. What type of sources would be most authoritative
+4. A priority: "high" (central to credibility or likely wrong), "medium" or "low"
+5. A concise web search query (under 10 words) that would surface authoritative sources for it
 
 Content to analyze:
 {prompt}
 
-Format your response as a numbered list of claims with verification guidance."""
+Respond with JSON only, in this shape:
+{{"claims": [{{"claim": "...", "why": "...", "sources": "...", "priority": "high", "search_query": "..."}}]}}"""
 
-        # Extract claims using GPT-4o-mini
-        claims_response = client.chat.completions.create(
+        # Extract claims using GPT-4o-mini in JSON mode
+        claims_response = call_with_resilience(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a fact-checking methodology coach who teaches verification processes."},
                 {"role": "user", "content": claim_extraction_prompt}
             ],
             max_tokens=1000,
-            temperature=0.3
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            scheduled_tokens=estimate_tokens(claim_extraction_prompt) + 1000
         )
         
-        claims_analysis = claims_response.choices[0].message.content.strip()
+        claims_output = claims_response.choices[0].message.content.strip()
         
-        # Step 2: Search for verification sources (limit to top 3 claims to control costs)
-        search_results = []
+        # Step 2: Search for verification sources - highest-value distinct claims first
+        claims = parse_claims(claims_output)
+        if claims:
+            claims_analysis = format_claims_analysis(claims)
+            search_queries = [claim['search_query'] for claim in rank_claims(claims)]
+        else:
+            # Model ignored JSON mode - fall back to scraping the free text
+            claims_analysis = claims_output
+            search_queries = extract_search_queries_from_text(claims_output)
         
-        # Extract first few claims for searching (simple parsing)
-        claims_text = claims_analysis.lower()
-        search_queries = []
-        
-        # Simple claim extraction for search (this could be more sophisticated)
-        lines = claims_analysis.split('\n')
-        for line in lines[:3]:  # Limit to first 3 claims
-            if any(keyword in line.lower() for keyword in ['claim:', '1.', '2.', '3.', '-']):
-                # Extract potential search terms (simple approach)
-                clean_line = line.replace('claim:', '').replace('1.', '').replace('2.', '').replace('3.', '').strip()
-                if len(clean_line) > 10 and len(clean_line) < 100:
-                    search_queries.append(clean_line[:80])  # Truncate long queries
-        
-        # Perform searches
-        for i, query in enumerate(search_queries[:2]):  # Limit to 2 searches to control costs
-            try:
-                search_result = search_google_custom(query, search_api_key, search_engine_id)
-                if search_result:
-                    search_results.append({
-                        'query': query,
-                        'results': search_result.get('items', [])[:3]  # Top 3 results
-                    })
-            except Exception as search_error:
-                search_results.append({
-                    'query': query,
-                    'error': str(search_error)
-                })
+        # Perform searches concurrently (budget limited to control costs)
+        search_results = search_claims_concurrently(
+            search_queries[:MAX_SEARCH_QUERIES], search_api_key, search_engine_id
+        )
         
         # Step 3: Generate verification coaching
         coaching_prompt = f"""You are a fact-checking methodology coach. Based on the claims analysis and search results below, provide educational guidance on verification methodology.
@@ -115,49 +139,209 @@ What Needs Further Verification:
 IMPORTANT: Focus on teaching verification methodology, not providing definitive true/false judgments. Explain the verification process and what a journalist should do next."""
 
         # Generate final coaching response
-        coaching_response = client.chat.completions.create(
+        coaching_response = call_with_resilience(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a fact-checking methodology coach who teaches verification processes, not a definitive fact-checker."},
                 {"role": "user", "content": coaching_prompt}
             ],
             max_tokens=1500,
-            temperature=0.3
+            temperature=0.3,
+            scheduled_tokens=estimate_tokens(coaching_prompt) + 1500
         )
         
         final_coaching = coaching_response.choices[0].message.content.strip()
         
         # Add implementation note
-        return f"""{final_coaching}
+        result = f"""{final_coaching}
 
 **IMPLEMENTATION NOTE:** This Custom Fact-Checking Coach uses GPT-4o-mini + Google Custom Search to teach verification methodology. It provides guidance on how to verify claims rather than definitive fact-checking results.
 
 **COST ESTIMATE:** ~$0.06-0.13 per analysis (much lower than full Perplexity integration)"""
+        # Coaching written without any sources (quota exhausted, searches failing or finding nothing) is not
+        # worth serving again; coaching that needed no searches is
+        if not search_queries or any(search_result.get('results') for search_result in search_results):
+            cache.put(cache_key, result)
+        return result
         
     except Exception as e:
-        return f"Custom Fact-Checking Coach Error: {str(e)}\n\nThis is the experimental Custom FCC. Please verify all information independently."
+        return ProviderFailure(f"Custom Fact-Checking Coach Error: {str(e)}\n\nThis is the experimental Custom FCC. Please verify all information independently.", e)
 
-def search_google_custom(query, api_key, search_engine_id):
-    """Perform Google Custom Search"""
+# Lower sorts first
+CLAIM_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+def parse_claims(claims_output):
+    """Parse the JSON claim extraction into a list of claim dicts (empty if unusable)"""
     try:
-        url = "https://www.googleapis.com/customsearch/v1"
-        params = {
-            'key': api_key,
-            'cx': search_engine_id,
-            'q': query,
-            'num': 3,  # Limit results to control costs
-            'safe': 'medium'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        return response.json()
+        data = json.loads(claims_output)
+    except (TypeError, ValueError):
+        return []
+    
+    raw_claims = data.get('claims', []) if isinstance(data, dict) else data
+    if not isinstance(raw_claims, list):
+        return []
+    
+    claims = []
+    for raw in raw_claims:
+        if not isinstance(raw, dict) or not str(raw.get('claim', '')).strip():
+            continue
+        priority = str(raw.get('priority', 'medium')).strip().lower()
+        claims.append({
+            'claim': str(raw['claim']).strip(),
+            'why': str(raw.get('why', '')).strip(),
+            'sources': str(raw.get('sources', '')).strip(),
+            'priority': priority if priority in CLAIM_PRIORITY_ORDER else 'medium',
+            'search_query': " ".join(str(raw.get('search_query') or raw['claim']).split())[:80]
+        })
+    return claims
+
+def normalize_query(query):
+    """Lowercase, strip punctuation and collapse whitespace so near-identical queries compare equal"""
+    kept = "".join(ch if ch.isalnum() else " " for ch in query.lower())
+    return " ".join(kept.split())
+
+def rank_claims(claims):
+    """
+    Deduplicate claims by normalized search query and order them by priority,
+    keeping the model's own ordering within a priority level.
+    """
+    seen = set()
+    distinct = []
+    for claim in claims:
+        normalized = normalize_query(claim['search_query'])
+        if len(normalized) < 4 or normalized in seen:
+            continue
+        seen.add(normalized)
+        distinct.append(claim)
+    
+    return sorted(distinct, key=lambda claim: CLAIM_PRIORITY_ORDER[claim['priority']])
+
+def format_claims_analysis(claims):
+    """Render structured claims as the numbered list used in the coaching prompt"""
+    lines = []
+    for number, claim in enumerate(claims, start=1):
+        lines.append(f"{number}. [{claim['priority'].upper()}] {claim['claim']}")
+        if claim['why']:
+            lines.append(f"   Why verify: {claim['why']}")
+        if claim['sources']:
+            lines.append(f"   Authoritative sources: {claim['sources']}")
+    return "\n".join(lines)
+
+def extract_search_queries_from_text(claims_analysis):
+    """Legacy line-scraping of free-text claims analysis (fallback when JSON is unavailable)"""
+    search_queries = []
+    
+    lines = claims_analysis.split('\n')
+    for line in lines[:3]:  # Limit to first 3 claims
+        if any(keyword in line.lower() for keyword in ['claim:', '1.', '2.', '3.', '-']):
+            # Extract potential search terms (simple approach)
+            clean_line = line.replace('claim:', '').replace('1.', '').replace('2.', '').replace('3.', '').strip()
+            if len(clean_line) > 10 and len(clean_line) < 100:
+                search_queries.append(clean_line[:80])  # Truncate long queries
+    
+    return search_queries
+
+def search_claims_concurrently(queries, api_key, search_engine_id, deadline=SEARCH_DEADLINE_SECONDS):
+    """
+    Run Google Custom Search for every query at once over the pooled HTTP session.
+    All searches share one deadline; any still running when it expires are
+    reported as timed out so coaching can proceed with what came back.
+    """
+    if not queries:
+        return []
+    
+    expires_at = time.monotonic() + deadline
+    futures = [
+        _search_executor.submit(contextvars.copy_context().run, search_google_custom, query, api_key, search_engine_id, min(provider_timeout("google_search"), deadline))
+        for query in queries
+    ]
+    wait(futures, timeout=max(0, expires_at - time.monotonic()))
+    
+    search_results = []
+    for query, future in zip(queries, futures):
+        if not future.done():
+            search_results.append({
+                'query': query,
+                'error': f"Search timed out after {deadline:g} seconds"
+            })
+            continue
         
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"Google Custom Search API error: {str(e)}")
+        try:
+            search_result = future.result()
+            if search_result:
+                search_results.append({
+                    'query': query,
+                    'results': search_result.get('items', [])[:3]  # Top 3 results
+                })
+        except Exception as search_error:
+            search_results.append({
+                'query': query,
+                'error': str(search_error)
+            })
+    
+    return search_results
+
+def search_google_custom(query, api_key, search_engine_id, timeout=None):
+    """
+    Perform Google Custom Search, reusing cached results for the same normalized
+    query and engine, and joining an identical search that is already in flight.
+    """
+    timeout = timeout or provider_timeout("google_search")
+    cache = get_named_cache("search_results", ttl_seconds=SEARCH_CACHE_TTL_SECONDS)
+    cache_key = make_cache_key("google_custom_search", search_engine_id, normalize_query(query), None, 3)
+    
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+    
+    with _inflight_lock:
+        inflight = _inflight_searches.get(cache_key)
+        if inflight is None:
+            inflight = Future()
+            _inflight_searches[cache_key] = inflight
+            is_owner = True
+        else:
+            is_owner = False
+    
+    if not is_owner:
+        try:
+            return inflight.result(timeout=timeout)
+        except FuturesTimeout:
+            raise Exception("Search timed out waiting for an identical in-flight search")
+    
+    try:
+        search_result = _fetch_google_custom(query, api_key, search_engine_id, timeout)
+        cache.put(cache_key, json.dumps(search_result))
+        inflight.set_result(search_result)
+        return search_result
     except Exception as e:
-        raise Exception(f"Search error: {str(e)}")
+        inflight.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight_searches.pop(cache_key, None)
+
+def _fetch_google_custom(query, api_key, search_engine_id, timeout):
+    """Call the Google Custom Search API, keeping only the fields MECCA uses"""
+    url = "https://www.googleapis.com/customsearch/v1"
+    params = {
+        'key': api_key,
+        'cx': search_engine_id,
+        'q': query,
+        'num': 3,  # Limit results to control costs
+        'safe': 'medium'
+    }
+    
+    def get_results():
+        response = get_http_session().get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response
+    
+    # Raises a typed ProviderError once retries are exhausted
+    response = call_with_resilience("google_search", get_results)
+    return {'items': response.json().get('items', [])[:3]}
 
 # Integration function to replace Perplexity calls
 def call_custom_fcc_integrated(prompt, openai_key, search_api_key, search_engine_id):
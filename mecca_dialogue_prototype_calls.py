@@ -1,75 +1,163 @@
 import json
+import re
 import requests
 import time
+from bisect import bisect_right
+from functools import partial
 import anthropic
 import openai
 import google.generativeai as genai
 from datetime import datetime
 import streamlit as st
+from core.clients import get_openai_client, get_anthropic_client, get_gemini_model, get_http_session
+from core.response_cache import get_response_cache, make_cache_key
+from core.resilience import ProviderFailure, call_with_resilience, open_stream_with_resilience, provider_timeout
+from core.tokens import estimate_tokens
+from core.dialogue_history import apply_finished_summary, recent_exchanges, schedule_summary_update
+from core.error_records import LOCAL_SOURCE
+from core.session_records import ValidationRecord, full_length
+
+# Marks an error yielded by stream_anthropic in place of (or after) the streamed text
+STREAM_ERROR_PREFIX = "Anthropic API Error:"
 
 def call_openai(prompt, api_key):
     """Call OpenAI GPT-4 API"""
     if not api_key:
-        return "OpenAI API key not configured"
+        return ProviderFailure("OpenAI API key not configured")
     
     try:
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
+        messages = [
+            {"role": "system", "content": "You are an expert editorial assistant focusing on comprehensive analysis."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        # Serve repeat analyses from the response cache
+        cache = get_response_cache()
+        cache_key = make_cache_key("openai", "gpt-4o", messages, 0.3, 2000)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        client = get_openai_client(api_key)
+        response = call_with_resilience(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert editorial assistant focusing on comprehensive analysis."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=messages,
             max_tokens=2000,
-            temperature=0.3
+            temperature=0.3,
+            scheduled_tokens=estimate_tokens(prompt) + 2000
         )
-        return response.choices[0].message.content.strip()
+        result = response.choices[0].message.content.strip()
+        cache.put(cache_key, result)
+        return result
     except Exception as e:
-        return f"OpenAI API Error: {str(e)}"
+        return ProviderFailure(f"OpenAI API Error: {str(e)}", e)
 
 def call_anthropic(prompt, article_text, api_key):
     """Call Anthropic Claude API"""
     if not api_key:
-        return "Anthropic API key not configured"
+        return ProviderFailure("Anthropic API key not configured")
     
     try:
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
+        # Serve repeat syntheses from the response cache
+        cache = get_response_cache()
+        cache_key = make_cache_key("anthropic", "claude-3-5-sonnet-20241022", [prompt, article_text], 0.3, 2500)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        client = get_anthropic_client(api_key)
+        message = call_with_resilience(
+            "anthropic",
+            client.messages.create,
             model="claude-3-5-sonnet-20241022",
             max_tokens=2500,
             temperature=0.3,
             system=prompt,
             messages=[
                 {"role": "user", "content": article_text}
-            ]
+            ],
+            scheduled_tokens=estimate_tokens(prompt) + estimate_tokens(article_text) + 2500
         )
-        return message.content[0].text.strip()
+        result = message.content[0].text.strip()
+        cache.put(cache_key, result)
+        return result
+    except Exception as e:
+        return ProviderFailure(f"Anthropic API Error: {str(e)}", e)
+
+def stream_anthropic(prompt, article_text, api_key):
+    """Stream Anthropic Claude output as it is generated (for st.write_stream)"""
+    if not api_key:
+        yield "Anthropic API key not configured"
+        return
+    
+    try:
+        # Same cache entry as call_anthropic - a cached synthesis is shown in one chunk
+        cache = get_response_cache()
+        cache_key = make_cache_key("anthropic", "claude-3-5-sonnet-20241022", [prompt, article_text], 0.3, 2500)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        client = get_anthropic_client(api_key)
+        manager, stream = open_stream_with_resilience("anthropic", lambda: client.messages.stream(
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2500,
+            temperature=0.3,
+            system=prompt,
+            messages=[
+                {"role": "user", "content": article_text}
+            ]
+        ), scheduled_tokens=estimate_tokens(prompt) + estimate_tokens(article_text) + 2500)
+        try:
+            for text in stream.text_stream:
+                chunks.append(text)
+                yield text
+        finally:
+            manager.__exit__(None, None, None)
+        
+        cache.put(cache_key, "".join(chunks).strip())
     except Exception as e:
-        return f"Anthropic API Error: {str(e)}"
+        yield f"\n\n{STREAM_ERROR_PREFIX} {str(e)}"
 
 def call_google(prompt, api_key):
     """Call Google Gemini API"""
     if not api_key:
-        return "Google API key not configured"
+        return ProviderFailure("Google API key not configured")
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        response = model.generate_content(
+        # Serve repeat analyses from the response cache
+        cache = get_response_cache()
+        cache_key = make_cache_key("google", "gemini-1.5-pro", prompt, 0.3, 2000)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        model = get_gemini_model(api_key, 'gemini-1.5-pro')
+        response = call_with_resilience(
+            "google",
+            model.generate_content,
             prompt,
             generation_config=genai.types.GenerationConfig(
                 max_output_tokens=2000,
                 temperature=0.3,
-            )
+            ),
+            request_options={"timeout": provider_timeout("google")},
+            scheduled_tokens=estimate_tokens(prompt) + 2000
         )
-        return response.text.strip()
+        result = response.text.strip()
+        cache.put(cache_key, result)
+        return result
     except Exception as e:
-        return f"Google API Error: {str(e)}"
+        return ProviderFailure(f"Google API Error: {str(e)}", e)
 
 def call_perplexity(prompt, api_key):
     """Call Perplexity API (will be replaced by Custom Fact-Checking Coach)"""
     if not api_key:
-        return "Perplexity API key not configured"
+        return ProviderFailure("Perplexity API key not configured")
     
     try:
         headers = {
@@ -92,21 +180,23 @@ def call_perplexity(prompt, api_key):
             "stream": False
         }
         
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
+        def post_completion():
+            response = get_http_session().post(
+                "https://api.perplexity.ai/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=provider_timeout("perplexity")
+            )
+            response.raise_for_status()
+            return response
         
-        if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content'].strip()
-        else:
-            return f"Perplexity API Error: {response.status_code} - {response.text}"
+        result = call_with_resilience(
+            "perplexity", post_completion, scheduled_tokens=estimate_tokens(prompt) + 2000
+        ).json()
+        return result['choices'][0]['message']['content'].strip()
             
     except Exception as e:
-        return f"Perplexity API Error: {str(e)}"
+        return ProviderFailure(f"Perplexity API Error: {str(e)}", e)
 
 def call_custom_fact_checking_coach(prompt, openai_key, bing_key=None):
     """
@@ -114,7 +204,7 @@ def call_custom_fact_checking_coach(prompt, openai_key, bing_key=None):
     Placeholder implementation - will be fully developed when Bing API key is available
     """
     if not openai_key:
-        return "OpenAI API key not configured for Custom Fact-Checking Coach"
+        return ProviderFailure("OpenAI API key not configured for Custom Fact-Checking Coach")
     
     # TODO: Implement Bing Search integration when API key is available
     if not bing_key:
@@ -143,7 +233,7 @@ This is a preview of the Custom Fact-Checking Coach that will replace Perplexity
     
     try:
         # When Bing API is available, this will extract claims, search, and provide coaching
-        client = openai.OpenAI(api_key=openai_key)
+        client = get_openai_client(openai_key)
         
         coaching_prompt = f"""You are a Fact-Checking Coach focused on verification methodology, not definitive fact-checking.
 
@@ -163,14 +253,17 @@ BE TRANSPARENT about limitations:
 Content to analyze for verification methodology:
 {prompt}"""
         
-        response = client.chat.completions.create(
+        response = call_with_resilience(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a verification methodology coach, not a fact-checker."},
                 {"role": "user", "content": coaching_prompt}
             ],
             max_tokens=1500,
-            temperature=0.3
+            temperature=0.3,
+            scheduled_tokens=estimate_tokens(coaching_prompt) + 1500
         )
         
         base_response = response.choices[0].message.content.strip()
@@ -181,32 +274,240 @@ Content to analyze for verification methodology:
 **IMPLEMENTATION NOTE:** This is the Custom Fact-Checking Coach running on GPT-4o-mini. Full web search capabilities will be added when Bing Search API is configured."""
         
     except Exception as e:
-        return f"Custom Fact-Checking Coach Error: {str(e)}"
+        return ProviderFailure(f"Custom Fact-Checking Coach Error: {str(e)}", e)
+
+# Curly quotes and apostrophes map to their straight forms so quoting style never causes a mismatch;
+# applied with str.replace, which is several times faster than translate() on long responses
+_QUOTE_REPLACEMENTS = (("“", '"'), ("”", '"'), ("„", '"'), ("‘", "'"), ("’", "'"), ("‚", "'"))
+# ...and for the substring scan, every whitespace character becomes a plain space as well
+_SCAN_REPLACEMENTS = _QUOTE_REPLACEMENTS + (("\n", " "), ("\r", " "), ("\t", " "), ("\f", " "), ("\v", " "), ("\u00a0", " "))
+
+def _replace_all(text, replacements):
+    """Apply character replacements; each maps one character to one, so positions are unchanged"""
+    for character, replacement in replacements:
+        if character in text:
+            text = text.replace(character, replacement)
+    return text
+
+# Quotes are aligned on word trigrams (single words for one- and two-word quotes)
+_QUOTE_SHINGLE_WORDS = 3
+
+# Alignment offsets this close together count as one match, so a dropped or added word doesn't split it
+_ALIGNMENT_SLACK = 2
+
+# Below this many characters of specialist text a plain substring scan beats building a QuoteIndex
+QUOTE_INDEX_MIN_CHARS = 150_000
+
+# Similarity at or above which a quote counts as verbatim, and the floor for a loose match
+QUOTE_VERIFIED_SCORE = 0.9
+QUOTE_PARTIAL_SCORE = 0.5
+
+# Display names, and the words that show which specialist the EiC is attributing a quote to
+SPECIALIST_LABELS = {"gpt": "GPT-4", "gemini": "Gemini", "perplexity": "Custom FCC"}
+_SPECIALIST_MENTIONS = {
+    "gpt": ("gpt",),
+    "gemini": ("gemini",),
+    "perplexity": ("fcc", "fact-check", "perplexity")
+}
+
+_WORD = re.compile(r"\S+")
+_SPACE_RUN = re.compile(r" {2,}")
+
+# Sentences crediting Gemini with a correction ("Gemini flagged ... Para 4", "... caught by Gemini")
+_GEMINI_CREDIT = re.compile(
+    r"\bgemini\b.*?\b(?:flagged|caught|noted|corrected|identified|spotted|found|fixed|marked|pointed out)\b"
+    r"|\b(?:flagged|caught|noted|corrected|identified|spotted|found|fixed|marked|pointed out)\s+by\s+gemini\b",
+    re.IGNORECASE
+)
+# ...unless the sentence says Gemini did not ("Gemini missed ... so I flagged it myself")
+_GEMINI_NEGATION = re.compile(
+    r"\b(?:missed|overlooked|ignored|failed to|didn't|did not|doesn't|does not|never|not|no)\b",
+    re.IGNORECASE
+)
+_PARAGRAPH_REFERENCE = re.compile(r"\bPara(?:graph)?\s+(\d+)", re.IGNORECASE)
+_WORD_EDGES = "\"'.,;:!?()[]{}<>*_`~…—–-"
+
+def normalize_quote_text(text):
+    """Straighten quotes, casefold and collapse whitespace for quote matching"""
+    return " ".join(_replace_all(text, _QUOTE_REPLACEMENTS).casefold().split())
+
+def _quote_words(text):
+    """(normalized word, start, end) for every word in text, ignoring surrounding punctuation and possessives"""
+    words = []
+    # Normalization maps character for character, so match positions still index the original text
+    for match in _WORD.finditer(_replace_all(text, _QUOTE_REPLACEMENTS)):
+        word = match.group(0).casefold().strip(_WORD_EDGES)
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word:
+            words.append((word, match.start(), match.end()))
+    return words
+
+class QuoteIndex:
+    """
+    Specialist responses tokenized once for quote attribution. Every word trigram
+    maps to where it occurs; a quote's trigrams vote for (specialist, offset)
+    alignments, and the best alignment gives the source, a similarity score (the
+    share of the quote's trigrams found there) and the character span it covers.
+    """
+    
+    def __init__(self, responses):
+        self.responses = dict(responses)
+        self.words = {}
+        self.trigrams = {}
+        self.unigrams = {}
+        for name, text in self.responses.items():
+            words = _quote_words(text)
+            self.words[name] = words
+            tokens = [word for word, _, _ in words]
+            for position, token in enumerate(tokens):
+                self.unigrams.setdefault(token, []).append((name, position))
+                shingle = tuple(tokens[position:position + _QUOTE_SHINGLE_WORDS])
+                if len(shingle) == _QUOTE_SHINGLE_WORDS:
+                    self.trigrams.setdefault(shingle, []).append((name, position))
+    
+    def locate(self, quote):
+        """Best source for a quote as {specialist, score, span, excerpt}, or None if nothing matches"""
+        tokens = [word for word, _, _ in _quote_words(quote)]
+        if not tokens:
+            return None
+        
+        size = _QUOTE_SHINGLE_WORDS if len(tokens) >= _QUOTE_SHINGLE_WORDS else 1
+        index = self.trigrams if size == _QUOTE_SHINGLE_WORDS else self.unigrams
+        shingle_count = len(tokens) - size + 1
+        
+        hits = {}
+        for i in range(shingle_count):
+            for name, position in index.get(tuple(tokens[i:i + size]) if size > 1 else tokens[i], ()):
+                hits.setdefault((name, position - i), set()).add(i)
+        if not hits:
+            return None
+        
+        (name, offset), _ = max(hits.items(), key=lambda item: len(item[1]))
+        matched = set()
+        positions = []
+        for nearby in range(offset - _ALIGNMENT_SLACK, offset + _ALIGNMENT_SLACK + 1):
+            found = hits.get((name, nearby), set())
+            matched |= found
+            positions.extend(nearby + i for i in found)
+        
+        # Span runs from the first to the last matched word in the source
+        words = self.words[name]
+        first = min(positions)
+        last = min(len(words), max(positions) + size) - 1
+        span = (words[first][1], words[last][2])
+        return {
+            "specialist": name,
+            "score": round(len(matched) / shingle_count, 2),
+            "span": span,
+            "excerpt": self.responses[name][span[0]:span[1]]
+        }
+
+class QuoteScan:
+    """
+    Specialist responses normalized once for a plain substring check. Finds only
+    quotes that appear verbatim (after straightening quotes, lower-casing and
+    collapsing whitespace), always with a score of 1.0; used instead of a
+    QuoteIndex while the responses are short enough that scanning them is cheaper.
+    """
+    
+    def __init__(self, responses):
+        self.responses = dict(responses)
+        self.texts = {}
+        self.shifts = {}
+        for name, text in self.responses.items():
+            spaced = _replace_all(text.lower(), _SCAN_REPLACEMENTS)
+            # (position in the collapsed text, characters dropped before it) after every collapsed run
+            starts, dropped = [0], [0]
+            if "  " in spaced:
+                for run in _SPACE_RUN.finditer(spaced):
+                    removed = dropped[-1] + len(run.group(0)) - 1
+                    starts.append(run.end() - removed)
+                    dropped.append(removed)
+                spaced = _SPACE_RUN.sub(" ", spaced)
+            self.texts[name] = spaced
+            self.shifts[name] = (starts, dropped)
+    
+    def _original_position(self, name, position):
+        starts, dropped = self.shifts[name]
+        return position + dropped[bisect_right(starts, position) - 1]
+    
+    def locate(self, quote):
+        """Source for a verbatim quote as {specialist, score, span, excerpt}, or None"""
+        needle = " ".join(_replace_all(quote, _QUOTE_REPLACEMENTS).lower().split())
+        if not needle:
+            return None
+        for name, text in self.texts.items():
+            position = text.find(needle)
+            if position >= 0:
+                span = (self._original_position(name, position), self._original_position(name, position + len(needle) - 1) + 1)
+                return {"specialist": name, "score": 1.0, "span": span, "excerpt": self.responses[name][span[0]:span[1]]}
+        return None
+
+def build_quote_matcher(specialist_responses):
+    """QuoteScan or QuoteIndex for the specialist responses - the trigram index only pays for its build once they are long"""
+    responses = [(name, str(response)) for name, response in specialist_responses.items()]
+    if sum(len(text) for _, text in responses) < QUOTE_INDEX_MIN_CHARS:
+        return QuoteScan(responses)
+    return QuoteIndex(responses)
+
+def _attributed_specialist(eic_response, quote_start):
+    """Which specialist the sentence leading up to a quote names, if exactly one"""
+    sentence_start = max(eic_response.rfind(mark, 0, quote_start) for mark in (".", "!", "?", "\n")) + 1
+    lead_in = eic_response[max(sentence_start, quote_start - 160):quote_start].lower()
+    named = [name for name, mentions in _SPECIALIST_MENTIONS.items() if any(m in lead_in for m in mentions)]
+    return named[0] if len(named) == 1 else None
 
 class MECCAResponseValidator:
     """Validates EiC responses for transparency and accuracy"""
     
     def __init__(self):
         self.validation_flags = []
+        self.quote_attributions = []
     
-    def validate_specialist_quotes(self, eic_response, specialist_responses):
-        """Check if EiC quotes are accurate"""
+    def validate_specialist_quotes(self, eic_response, specialist_responses, gemini_report=None, quote_matcher=None):
+        """
+        Check if EiC quotes are accurate. Each substantial quote is attributed to
+        the specialist it most likely came from; the attributions (specialist,
+        similarity score, character span in that response) are kept in
+        self.quote_attributions for the dialogue log and UI. Pass the session's
+        quote_matcher to reuse it; otherwise one is built for this call.
+        """
         flags = []
+        self.quote_attributions = []
+        
+        # Extract quoted content from EiC response (straight or curly quotes; replacement keeps positions)
+        eic_text = _replace_all(eic_response, _QUOTE_REPLACEMENTS)
+        
+        # Quotes of Gemini corrections are matched against its parsed records directly
+        gemini_quotes = {normalize_quote_text(text) for text in gemini_report.quoted_text()} if gemini_report is not None else set()
+        index = quote_matcher or build_quote_matcher(specialist_responses)
         
-        # Extract quoted content from EiC response
-        import re
-        quotes = re.findall(r'"([^"]*)"', eic_response)
-        
-        for quote in quotes:
-            if len(quote) > 10:  # Only check substantial quotes
-                found_in_specialists = False
-                for specialist_name, response in specialist_responses.items():
-                    if quote.lower() in response.lower():
-                        found_in_specialists = True
-                        break
-                
-                if not found_in_specialists:
-                    flags.append(f"Unverified quote: '{quote[:50]}...'")
+        for match in re.finditer(r'"([^"]*)"', eic_text):
+            quote = match.group(1)
+            if len(quote) <= 10:  # Only check substantial quotes
+                continue
+            
+            if normalize_quote_text(quote) in gemini_quotes:
+                source = {"specialist": "gemini", "score": 1.0, "span": None, "excerpt": quote}
+            else:
+                source = index.locate(quote)
+            
+            if source is None or source["score"] < QUOTE_PARTIAL_SCORE:
+                flags.append(f"Unverified quote: '{quote[:50]}...'")
+                self.quote_attributions.append({"quote": quote, "specialist": None, "score": source["score"] if source else 0.0, "span": None, "excerpt": ""})
+                continue
+            
+            self.quote_attributions.append(dict(source, quote=quote))
+            label = SPECIALIST_LABELS.get(source["specialist"], source["specialist"])
+            if source["score"] < QUOTE_VERIFIED_SCORE:
+                flags.append(f"Loosely matched quote ({source['score']:.0%} match with {label}): '{quote[:50]}...'")
+            
+            attributed = _attributed_specialist(eic_text, match.start())
+            if attributed and attributed != source["specialist"]:
+                flags.append(
+                    f"Quote attributed to {SPECIALIST_LABELS.get(attributed, attributed)} appears in {label}'s response: '{quote[:50]}...'"
+                )
         
         return flags
     
@@ -229,37 +530,73 @@ class MECCAResponseValidator:
         
         return flags
     
-    def validate_response(self, eic_response, specialist_responses):
+    def validate_gemini_references(self, eic_response, gemini_report):
+        """Check that corrections attributed to Gemini point at paragraphs Gemini actually flagged"""
+        flags = []
+        if gemini_report is None:
+            return flags
+        
+        # Local pre-check findings are not Gemini's, so crediting Gemini with them is flagged too
+        gemini_paragraphs = {record.paragraph for record in gemini_report.records if record.source != LOCAL_SOURCE}
+        
+        # Only sentences that credit Gemini with a correction; honest notes of what it missed are fine
+        for sentence in re.split(r'(?<=[.!?])\s+|\n', eic_response):
+            if not _GEMINI_CREDIT.search(sentence) or _GEMINI_NEGATION.search(sentence):
+                continue
+            for paragraph in _PARAGRAPH_REFERENCE.findall(sentence):
+                if int(paragraph) not in gemini_paragraphs:
+                    flags.append(f"Gemini flagged nothing in Para {paragraph}")
+        
+        return flags
+    
+    def validate_response(self, eic_response, specialist_responses, gemini_report=None, quote_matcher=None):
         """Main validation function"""
         self.validation_flags = []
         
-        quote_flags = self.validate_specialist_quotes(eic_response, specialist_responses)
+        quote_flags = self.validate_specialist_quotes(eic_response, specialist_responses, gemini_report, quote_matcher)
         performance_flags = self.validate_performance_claims(eic_response, specialist_responses)
+        gemini_flags = self.validate_gemini_references(eic_response, gemini_report)
         
         self.validation_flags.extend(quote_flags)
         self.validation_flags.extend(performance_flags)
+        self.validation_flags.extend(gemini_flags)
         
         return {
             'flags': self.validation_flags,
-            'is_valid': len(self.validation_flags) == 0
+            'is_valid': len(self.validation_flags) == 0,
+            'quote_attributions': self.quote_attributions
         }
 
-def enhanced_dialogue_handler_v2(user_question, session_state, anthropic_key):
-    """Enhanced dialogue handler with transparency validation"""
+def _dialogue_specialist_responses(editor_responses):
+    return {
+        "gpt": editor_responses.get("gpt", ""),
+        "gemini": editor_responses.get("gemini", ""),
+        "perplexity": editor_responses.get("custom_fcc", editor_responses.get("perplexity", ""))
+    }
+
+def session_quote_matcher(session_state):
+    """
+    The quote matcher for the session's specialist responses, built once per
+    analysis and kept on its record (so it is evicted with it); callers clear
+    session_state.quote_matcher when the responses change.
+    """
+    quote_matcher = session_state.get('quote_matcher')
+    if quote_matcher is None:
+        quote_matcher = build_quote_matcher(_dialogue_specialist_responses(session_state.editor_responses))
+        session_state.quote_matcher = quote_matcher
+    return quote_matcher
+
+def _build_dialogue_request(user_question, session_state):
+    """Assemble specialist responses, system prompt and message history for a dialogue turn"""
     from mecca_dialogue_prototype_prompts import get_enhanced_dialogue_system_prompt_v2
     
-    if not anthropic_key:
-        return "Anthropic API key not configured for dialogue feature."
+    # Get specialist responses from session state (Custom FCC replaced Perplexity)
+    specialist_responses = _dialogue_specialist_responses(session_state.editor_responses)
     
-    try:
-        # Get specialist responses from session state
-        specialist_responses = {
-            "gpt": session_state.editor_responses.get("gpt", ""),
-            "gemini": session_state.editor_responses.get("gemini", ""),
-            "perplexity": session_state.editor_responses.get("perplexity", "")
-        }
-        
-        # Create enhanced system prompt with maximum transparency
+    # Create enhanced system prompt with maximum transparency. It is built once per
+    # analysis and reused verbatim so Anthropic's prompt cache hits on every turn.
+    system_prompt = session_state.get('dialogue_system_prompt')
+    if not system_prompt:
         system_prompt = get_enhanced_dialogue_system_prompt_v2(
             specialist_responses["gpt"],
             specialist_responses["gemini"], 
@@ -267,63 +604,194 @@ def enhanced_dialogue_handler_v2(user_question, session_state, anthropic_key):
             session_state.original_article,
             session_state.context
         )
-        
-        # Build conversation history
-        messages = []
-        
-        # Add conversation history
-        for exchange in session_state.dialogue_history:
-            messages.append({"role": "user", "content": exchange["question"]})
-            messages.append({"role": "assistant", "content": exchange["answer"]})
-        
-        # Add current question
-        messages.append({"role": "user", "content": user_question})
+        session_state.dialogue_system_prompt = system_prompt
+    
+    # Article and specialist responses form the cacheable prefix
+    system_blocks = [
+        {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+    ]
+    
+    # Older exchanges are carried as a running summary, after the cached block so it stays byte-identical
+    apply_finished_summary(session_state)
+    if session_state.get('dialogue_summary'):
+        system_blocks.append({
+            "type": "text",
+            "text": f"EARLIER IN THIS CONVERSATION (summary of exchanges no longer shown in full):\n{session_state.dialogue_summary}"
+        })
+    
+    # Build conversation history
+    messages = []
+    
+    # Add the recent exchanges word for word, within the history token budget
+    # (all unsummarized ones while the summary is catching up, so none go missing)
+    summary_pending = session_state.get('dialogue_summary_job') is not None
+    for exchange in recent_exchanges(
+        session_state.dialogue_history, session_state.get('dialogue_summarized_count', 0), summary_pending=summary_pending
+    ):
+        messages.append({"role": "user", "content": exchange["question"]})
+        messages.append({"role": "assistant", "content": exchange["answer"]})
+    
+    # Add current question, marked so the next turn can reuse the history prefix too
+    messages.append({
+        "role": "user",
+        "content": [{"type": "text", "text": user_question, "cache_control": {"type": "ephemeral"}}]
+    })
+    
+    return specialist_responses, system_blocks, messages
+
+def summarize_dialogue_exchanges(current_summary, exchanges, api_key):
+    """Fold dialogue exchanges into the running summary with a small, fast model"""
+    from mecca_dialogue_prototype_prompts import get_dialogue_summary_prompt
+    
+    try:
+        prompt = get_dialogue_summary_prompt(current_summary, exchanges)
+        client = get_anthropic_client(api_key)
+        message = call_with_resilience(
+            "anthropic",
+            client.messages.create,
+            model="claude-3-5-haiku-20241022",
+            max_tokens=500,
+            temperature=0,
+            messages=[{"role": "user", "content": prompt}],
+            scheduled_tokens=estimate_tokens(prompt) + 500
+        )
+        return message.content[0].text.strip()
+    except Exception as e:
+        return ProviderFailure(f"Dialogue summary error: {str(e)}", e)
+
+def update_dialogue_summary(session_state, anthropic_key):
+    """After a turn, fold exchanges that left the verbatim window into the summary (in the background)"""
+    if anthropic_key:
+        schedule_summary_update(session_state, partial(summarize_dialogue_exchanges, api_key=anthropic_key))
+
+def _estimate_dialogue_tokens(system_blocks, messages, max_tokens=2000):
+    """Rough token cost of a dialogue turn, for the provider scheduler"""
+    text_parts = [block["text"] for block in system_blocks]
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, list):
+            text_parts.extend(block["text"] for block in content)
+        else:
+            text_parts.append(content)
+    return sum(estimate_tokens(part) for part in text_parts) + max_tokens
+
+def _summarize_usage(usage):
+    """Input-token usage and prompt-cache hit rate for one dialogue turn"""
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    cache_creation = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    total_input = input_tokens + cache_creation + cache_read
+    
+    return {
+        "input_tokens": total_input,
+        "uncached_input_tokens": input_tokens,
+        "cache_creation_input_tokens": cache_creation,
+        "cache_read_input_tokens": cache_read,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_hit_rate": cache_read / total_input if total_input else 0.0
+    }
+
+def _validate_dialogue_answer(user_question, eic_answer, specialist_responses, session_state):
+    """Run transparency validation on a completed answer and record it; returns the warning note (or "")"""
+    validator = MECCAResponseValidator()
+    validation_result = validator.validate_response(
+        eic_answer, specialist_responses, session_state.get('gemini_errors'), session_quote_matcher(session_state)
+    )
+    
+    # Store validation results - the answer itself and its quote attributions are kept once, in the
+    # dialogue exchange the caller appends next, so the record only points at it by ID
+    if 'validation_history' not in session_state:
+        session_state.validation_history = []
+    
+    session_state.validation_history.append(ValidationRecord(
+        full_length(session_state.dialogue_history),
+        validation_result['flags'],
+        datetime.now().isoformat()
+    ))
+    session_state.last_quote_attributions = validation_result['quote_attributions']
+    
+    # Log for debugging if enabled
+    if st.secrets.get("ENABLE_LOGGING", False):
+        log_data = {
+            "timestamp": datetime.now().isoformat(),
+            "question": user_question,
+            "eic_response": eic_answer,
+            "validation_flags": validation_result.get('flags', []),
+            "quote_attributions": validation_result.get('quote_attributions', [])
+        }
+        st.write("DEBUG LOG:", log_data)
+    
+    # Add validation warnings if needed
+    if validation_result['flags']:
+        return f"\n\n⚠️ Transparency Note: This response has been flagged for review: {', '.join(validation_result['flags'])}"
+    
+    return ""
+
+def enhanced_dialogue_handler_v2(user_question, session_state, anthropic_key):
+    """Enhanced dialogue handler with transparency validation"""
+    if not anthropic_key:
+        return "Anthropic API key not configured for dialogue feature."
+    
+    try:
+        specialist_responses, system_blocks, messages = _build_dialogue_request(user_question, session_state)
         
         # Call Claude with enhanced transparency protocols
-        client = anthropic.Anthropic(api_key=anthropic_key)
-        response = client.messages.create(
+        client = get_anthropic_client(anthropic_key)
+        response = call_with_resilience(
+            "anthropic",
+            client.messages.create,
             model="claude-3-5-sonnet-20241022",
             max_tokens=2000,
             temperature=0.3,
-            system=system_prompt,
-            messages=messages
+            system=system_blocks,
+            messages=messages,
+            scheduled_tokens=_estimate_dialogue_tokens(system_blocks, messages)
         )
+        session_state.last_dialogue_usage = _summarize_usage(response.usage)
         
         eic_answer = response.content[0].text.strip()
         
         # Validate response for transparency
-        validator = MECCAResponseValidator()
-        validation_result = validator.validate_response(eic_answer, specialist_responses)
-        
-        # Store validation results
-        if 'validation_history' not in session_state:
-            session_state.validation_history = []
-        
-        session_state.validation_history.append({
-            'question': user_question,
-            'response': eic_answer,
-            'validation_flags': validation_result['flags'],
-            'timestamp': datetime.now().isoformat()
-        })
+        return eic_answer + _validate_dialogue_answer(user_question, eic_answer, specialist_responses, session_state)
         
-        # Log for debugging if enabled
-        if st.secrets.get("ENABLE_LOGGING", False):
-            log_data = {
-                "timestamp": datetime.now().isoformat(),
-                "question": user_question,
-                "eic_response": eic_answer,
-                "validation_flags": validation_result.get('flags', [])
-            }
-            st.write("DEBUG LOG:", log_data)
+    except Exception as e:
+        return f"Dialogue Error: {str(e)}"
+
+def enhanced_dialogue_handler_v2_stream(user_question, session_state, anthropic_key):
+    """
+    Streaming variant of enhanced_dialogue_handler_v2 for st.write_stream.
+    Yields answer text as it arrives; validation runs on the completed answer
+    and any transparency note is yielded as the final chunk.
+    """
+    if not anthropic_key:
+        yield "Anthropic API key not configured for dialogue feature."
+        return
+    
+    chunks = []
+    try:
+        specialist_responses, system_blocks, messages = _build_dialogue_request(user_question, session_state)
         
-        # Add validation warnings if needed
-        if validation_result['flags']:
-            eic_answer += f"\n\n⚠️ Transparency Note: This response has been flagged for review: {', '.join(validation_result['flags'])}"
+        client = get_anthropic_client(anthropic_key)
+        manager, stream = open_stream_with_resilience("anthropic", lambda: client.messages.stream(
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2000,
+            temperature=0.3,
+            system=system_blocks,
+            messages=messages
+        ), scheduled_tokens=_estimate_dialogue_tokens(system_blocks, messages))
+        try:
+            for text in stream.text_stream:
+                chunks.append(text)
+                yield text
+            session_state.last_dialogue_usage = _summarize_usage(stream.get_final_message().usage)
+        finally:
+            manager.__exit__(None, None, None)
         
-        return eic_answer
+        eic_answer = "".join(chunks).strip()
+        yield _validate_dialogue_answer(user_question, eic_answer, specialist_responses, session_state)
         
     except Exception as e:
-        return f"Dialogue Error: {str(e)}"
+        yield f"\n\nDialogue Error: {str(e)}"
 
 # Legacy function for backward compatibility
 def enhanced_dialogue_handler(user_question, session_state, anthropic_key):
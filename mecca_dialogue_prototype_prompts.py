@@ -1,3 +1,21 @@
+from core.tokens import estimate_tokens
+from core.resilience import is_failure
+from core.error_records import LOCAL_ONLY_NOTE, parse_error_report
+from core.prompt_budget import PromptSection, assemble_prompt
+from core.prompt_templates import prompt_templates, render_sections, slot
+
+def _custom_override_section(custom_context):
+    """The writer's custom guidance, filled in after the static scaffolding of a prompt"""
+    if not custom_context:
+        return ""
+    return f"""
+CRITICAL CONTEXT OVERRIDE:
+The writer has provided specific guidance: "{custom_context}"
+This custom context takes TOP PRIORITY - override default role boundaries if needed to address their specific request.
+
+
+"""
+
 def get_editorial_prompt(model_key, article_text, writer_role, context):
     """Generate model-specific editorial prompts with role adaptation and context, now enforcing basics-first hierarchy"""
     
@@ -5,6 +23,22 @@ def get_editorial_prompt(model_key, article_text, writer_role, context):
     if model_key == "gemini":
         return get_gemini_error_detection_utility(article_text)
     
+    # The scaffolding is compiled once per model, roles and content type - only the slots are filled per request
+    sections = prompt_templates.get("editorial", (
+        model_key,
+        context.get('editorial_role', 'Writing Coach'),
+        writer_role,
+        context.get('content_type', 'article')
+    ), _editorial_prompt_sections)
+    
+    return assemble_prompt(render_sections(sections, {
+        "custom_override": _custom_override_section(context.get('custom_context', '')),
+        "article_text": article_text
+    }), model_key)
+
+def _editorial_prompt_sections(model_key, editorial_role, writer_role, content_type):
+    """Editorial prompt sections for one model, role and content type, with slots for the per-request parts"""
+    
     # Map display names to model keys (for non-Gemini models)
     display_names = {
         "gpt-4o": "GPT-4",
@@ -14,20 +48,6 @@ def get_editorial_prompt(model_key, article_text, writer_role, context):
     
     model_name = display_names.get(model_key, model_key)
     
-    # Get editorial role context
-    editorial_role = context.get('editorial_role', 'Writing Coach')
-    content_type = context.get('content_type', 'article')
-    custom_context = context.get('custom_context', '')
-    
-    # Build custom context override section
-    custom_override = ""
-    if custom_context:
-        custom_override = f"""
-CRITICAL CONTEXT OVERRIDE:
-The writer has provided specific guidance: "{custom_context}"
-This custom context takes TOP PRIORITY - override default role boundaries if needed to address their specific request.
-"""
-    
     # Base role definitions with clear specialization but critical issue overlap
     role_definitions = {
         "Copy Editor": {
@@ -129,10 +149,11 @@ Inappropriate quote control includes:
 Focus on editorial value, not content control.
 """
     
-    # Generate the complete prompt with fundamentals-first structure
-    prompt = f"""{custom_override}
-
-You are an expert editorial assistant working as part of MECCA (Multiple Edit and Cross-Check Assistant). 
+    # Generate the complete prompt with fundamentals-first structure, sized to the model's token budget.
+    # The writer's guidance, role instructions and article are required; guidance blocks are trimmed first.
+    # The writer's guidance sits just before the article so everything above it is a shared static prefix.
+    return [
+        PromptSection("role", f"""You are an expert editorial assistant working as part of MECCA (Multiple Edit and Cross-Check Assistant). 
 
 {model_specialty}
 
@@ -142,12 +163,16 @@ Content type: {content_type}
 Editorial approach: {editorial_role}
 Tone: {tone_guidance}
 
-{quote_guidance}
+"""),
+        PromptSection("quote_guidance", f"""{quote_guidance}
 
-{basics_first_block}
-{advanced_guidance}
+""", priority=3, droppable=True),
+        PromptSection("fundamentals", f"""{basics_first_block}
+""", priority=1),
+        PromptSection("advanced_guidance", f"""{advanced_guidance}
 
-CRITICAL OVERSIGHT RESPONSIBILITY:
+""", priority=2),
+        PromptSection("oversight", """CRITICAL OVERSIGHT RESPONSIBILITY:
 While focusing on your specialty, always flag:
 - Obvious factual errors that could embarrass the publication
 - Major credibility threats
@@ -157,18 +182,38 @@ While focusing on your specialty, always flag:
 
 Remember: Different AI systems have different strengths and blind spots. Your feedback will be combined with other specialists and synthesized by an Editor-in-Chief who will identify any critical issues you might miss.
 
-Article to review:
-{article_text}"""
-
-    return prompt
+""", priority=1),
+        PromptSection("custom_context", slot("custom_override")),
+        PromptSection("article", f"""Article to review:
+{slot("article_text")}""")
+    ]
 
-def get_gemini_error_detection_utility(article_text):
+def get_gemini_error_detection_utility(article_text, already_found=None):
     """
     Ultra-simple error detection utility for Gemini with educational component.
     Completely isolated from custom context - maximum reliability utility.
+    `already_found` is an ErrorReport from the local pre-pass; Gemini is told not to repeat it.
     """
     
-    prompt = f"""You are a high-precision error detection utility. Your only function is to identify and report mechanical errors in text.
+    sections = prompt_templates.get("gemini_errors", (), _gemini_error_detection_sections)
+    
+    already_found_section = ""
+    if already_found is not None and already_found.records:
+        already_found_section = f"""
+ALREADY FOUND:
+An automated pre-check has already reported the corrections below (paragraphs are counted as blocks of text separated by blank lines). Do NOT repeat them - report only errors not on this list. If there are none, respond with "NO ERRORS DETECTED".
+{already_found.to_text()}
+"""
+    
+    return assemble_prompt(render_sections(sections, {
+        "already_found": already_found_section,
+        "article_text": article_text
+    }), "gemini")
+
+def _gemini_error_detection_sections():
+    """Gemini error detection sections - fully static apart from the pre-pass list and the text"""
+    
+    instructions = """You are a high-precision error detection utility. Your only function is to identify and report mechanical errors in text.
 
 SCAN FOR THE FOLLOWING ITEMS ONLY:
 • Spelling mistakes
@@ -193,23 +238,27 @@ If no errors are found, respond with: "NO ERRORS DETECTED"
 
 ABSOLUTE PROHIBITION:
 Your response must contain ONLY the list of corrections in the specified format or "NO ERRORS DETECTED". Any commentary, analysis, explanation, or text outside this rigid structure is a system failure.
+"""
 
+    # The pre-pass list is optional: its findings are merged back in afterwards even if it is dropped to fit
+    return [
+        PromptSection("instructions", instructions),
+        PromptSection("already_found", slot("already_found"), priority=1, droppable=True),
+        PromptSection("article", f"""
 TEXT TO SCAN:
-{article_text}"""
-
-    return prompt
+{slot("article_text")}""")
+    ]
 
 def get_story_conference_prompt(model_key, story_data, writer_role, context):
     """Generate story conference prompts for evaluating story ideas"""
     
-    # Map display names to model keys
-    display_names = {
-        "gpt-4o": "GPT-4",
-        "gemini": "Gemini", 
-        "perplexity": "Perplexity"
-    }
-    
-    model_name = display_names.get(model_key, model_key)
+    guided_mode = bool(context.get('guided_mode') and context.get('core_questions'))
+    sections = prompt_templates.get("story_conference", (
+        model_key,
+        context.get('editorial_role', 'Story Development'),
+        writer_role,
+        guided_mode
+    ), _story_conference_sections)
     
     # Build readership context
     readership_detail = context.get('readership_detail', '')
@@ -220,16 +269,43 @@ def get_story_conference_prompt(model_key, story_data, writer_role, context):
     else:
         audience_context = target_audience
     
-    # Custom context handling
-    custom_context = context.get('custom_context', '')
-    custom_override = ""
-    if custom_context:
-        custom_override = f"""
-CRITICAL CONTEXT OVERRIDE:
-The writer has provided specific guidance: "{custom_context}"
-This custom context takes TOP PRIORITY - override default role boundaries if needed to address their specific request.
+    # Handle guided vs free-form mode
+    guided_context = ""
+    if guided_mode:
+        guided_context = f"""
+WRITER'S STORY CONFERENCE PREPARATION:
+The writer has prepared by answering the core editorial questions:
+
+Story Concept: {context['core_questions'].get('story_headline', 'Not provided')}
+Biggest Version/Impact: {context['core_questions'].get('biggest_version', 'Not provided')}
+Potential Pitfalls: {context['core_questions'].get('pitfalls', 'Not provided')}
+Timing/Urgency: {context['core_questions'].get('why_now', 'Not provided')}
+
+Your job is to EVALUATE their editorial thinking. Are they right about the scope? Did they miss critical pitfalls? Is their assessment realistic?
 """
     
+    custom_context = context.get('custom_context', '')
+    
+    return assemble_prompt(render_sections(sections, {
+        "audience_context": audience_context,
+        "custom_context": custom_context or "None provided",
+        "guided_context": guided_context,
+        "custom_override": _custom_override_section(custom_context),
+        "story_content": story_data["story_content"]
+    }), model_key)
+
+def _story_conference_sections(model_key, editorial_role, writer_role, guided_mode):
+    """Story conference prompt sections for one model, roles and mode, with slots for the per-request parts"""
+    
+    # Map display names to model keys
+    display_names = {
+        "gpt-4o": "GPT-4",
+        "gemini": "Gemini", 
+        "perplexity": "Perplexity"
+    }
+    
+    model_name = display_names.get(model_key, model_key)
+    
     # Core questions framework
     core_questions = """
 CORE EDITORIAL QUESTIONS (Address these first):
@@ -238,7 +314,7 @@ CORE EDITORIAL QUESTIONS (Address these first):
 
 2. "What's the biggest version?" / "So what?" 
    - How does this connect to larger patterns, trends, or systems?
-   - Why will the target readership ({audience_context}) care? What's the human impact?
+   - Why will the target readership (see EDITORIAL CONTEXT) care? What's the human impact?
    - What makes this more than just an isolated incident?
 
 3. "What are the pitfalls?" - What could make this "not a story"?
@@ -249,24 +325,12 @@ CORE EDITORIAL QUESTIONS (Address these first):
 4. "Why now?" - What makes this timely and urgent?
 
 After addressing these core questions, provide your specialized analysis below.
-""".format(audience_context=audience_context)
+"""
     
     # Handle guided vs free-form mode
-    if context.get('guided_mode') and context.get('core_questions'):
-        guided_context = f"""
-WRITER'S STORY CONFERENCE PREPARATION:
-The writer has prepared by answering the core editorial questions:
-
-Story Concept: {context['core_questions'].get('story_headline', 'Not provided')}
-Biggest Version/Impact: {context['core_questions'].get('biggest_version', 'Not provided')}
-Potential Pitfalls: {context['core_questions'].get('pitfalls', 'Not provided')}
-Timing/Urgency: {context['core_questions'].get('why_now', 'Not provided')}
-
-Your job is to EVALUATE their editorial thinking. Are they right about the scope? Did they miss critical pitfalls? Is their assessment realistic?
-"""
+    if guided_mode:
         mode_instruction = "Assess and build on the writer's story conference preparation."
     else:
-        guided_context = ""
         mode_instruction = "Help develop this story concept by addressing the core editorial questions."
     
     # Writer role adaptations with measured encouragement
@@ -313,7 +377,7 @@ Focus on story structure, audience engagement, and narrative development:
 - How would this story unfold for readers?
 - What's the most compelling way to tell this?
 - Where are the narrative hooks and human elements?
-- How does this serve the specific target readership: {audience_context}?
+- How does this serve the specific target readership named in the editorial context?
 
 CLARIFYING QUESTIONS:
 Generate 3-5 specific questions about story structure and audience:
@@ -357,24 +421,14 @@ Generate 3-5 strategic reporting questions:
 {mode_instruction}
 """
     
-    # Build the complete prompt
-    story_content = story_data["story_content"]
-    
-    prompt = f"""{custom_override}
-
-You are participating in an editorial story conference to evaluate a story pitch/concept.
-
-EDITORIAL CONTEXT:
-- Writer role: {writer_role}
-- Target readership: {audience_context}
-- Editorial approach: {context.get('editorial_role', 'Story Development')}
-- Custom context: {custom_context or "None provided"}
-
-{guided_context}
-
+    # Build the complete prompt - the specialty and tone blocks come first so they form a
+    # static prefix shared by every pitch; the readership, custom guidance and story follow
+    return [
+        PromptSection("specialty", f"""You are participating in an editorial story conference to evaluate a story pitch/concept.
 {model_specialty}
 
-STORY CONFERENCE TONE:
+"""),
+        PromptSection("tone", f"""STORY CONFERENCE TONE:
 Maintain professional editorial standards while identifying genuine strengths in the story concept. {encouragement}
 
 Do not cheerlead, but do recognize:
@@ -386,10 +440,21 @@ Do not cheerlead, but do recognize:
 
 Frame as: "This element works because..." or "Your instinct about X is sound, though Y needs attention."
 
-STORY CONCEPT TO EVALUATE:
-{story_content}"""
+""", priority=2, droppable=True),
+        PromptSection("editorial_context", f"""EDITORIAL CONTEXT:
+- Writer role: {writer_role}
+- Target readership: {slot("audience_context")}
+- Editorial approach: {editorial_role}
+- Custom context: {slot("custom_context")}
+
+"""),
+        PromptSection("guided_context", f"""{slot("guided_context")}
 
-    return prompt
+""", priority=1),
+        PromptSection("custom_context", slot("custom_override")),
+        PromptSection("story", f"""STORY CONCEPT TO EVALUATE:
+{slot("story_content")}""")
+    ]
 
 def get_story_eic_synthesis_prompt(gpt_response, gemini_response, perplexity_response, writer_role, context):
     """Editor-in-Chief synthesis prompt for story conference mode"""
@@ -412,6 +477,17 @@ def get_story_eic_synthesis_prompt(gpt_response, gemini_response, perplexity_res
     
     context_string = " | ".join(context_details)
     
+    template = prompt_templates.get("story_eic_synthesis", (writer_role,), _story_eic_synthesis_template)
+    return template.render({
+        "context_string": context_string,
+        "gpt_response": gpt_response,
+        "gemini_response": gemini_response,
+        "perplexity_response": perplexity_response
+    })
+
+def _story_eic_synthesis_template(writer_role):
+    """Story conference EiC synthesis text for one writer role, with slots for the context and specialist responses"""
+    
     # Determine encouragement based on writer role
     if writer_role == "student":
         encouragement_note = """
@@ -420,15 +496,10 @@ For student writers: Recognize promising journalistic instincts and editorial th
         encouragement_note = """
 For professional writers: Acknowledge solid news judgment and story foundations while addressing practical development challenges."""
     
+    # The context and specialist evaluations come last, after the output structure and
+    # guidelines, so everything above them is the same for every pitch by this kind of writer
     prompt = f"""You are the Editor-in-Chief synthesizing story conference feedback from multiple editorial specialists.
 
-CONTEXT: {context_string}
-
-SPECIALIST STORY EVALUATIONS:
-GPT-4 Analysis: {gpt_response}
-Gemini Analysis: {gemini_response}
-Perplexity Analysis: {perplexity_response}
-
 OUTPUT STRUCTURE - STORY CONFERENCE ASSESSMENT:
 
 🎯 EDITORIAL ASSESSMENT
@@ -491,7 +562,14 @@ TRANSPARENCY REQUIREMENTS:
 - Explain editorial reasoning clearly
 - Focus on helping the writer develop both this story AND their editorial judgment
 
-Your role is helping writers understand editorial thinking about story development while providing actionable guidance for this specific concept."""
+Your role is helping writers understand editorial thinking about story development while providing actionable guidance for this specific concept.
+
+CONTEXT: {slot("context_string")}
+
+SPECIALIST STORY EVALUATIONS:
+GPT-4 Analysis: {slot("gpt_response")}
+Gemini Analysis: {slot("gemini_response")}
+Perplexity Analysis: {slot("perplexity_response")}"""
 
     return prompt
 
@@ -518,6 +596,17 @@ def get_eic_synthesis_prompt_v3(gpt_response, gemini_response, claude_response,
     
     context_string = " | ".join(context_details) if context_details else "General editorial review"
     
+    template = prompt_templates.get("eic_synthesis", (writer_role,), _eic_synthesis_template)
+    return template.render({
+        "context_string": context_string,
+        "gpt_response": gpt_response,
+        "gemini_response": gemini_response,
+        "perplexity_response": perplexity_response
+    })
+
+def _eic_synthesis_template(writer_role):
+    """Article EiC synthesis text for one writer role, with slots for the context and specialist responses"""
+    
     # Determine tone based on writer role with measured encouragement
     if writer_role == "student":
         encouragement_note = """
@@ -526,15 +615,10 @@ For student writers: Identify genuine strengths in the writing and approach whil
         encouragement_note = """
 For professional writers: Acknowledge solid journalistic practices and effective elements while providing direct guidance on improvements."""
     
+    # Instructions first and per-review material last: only the context and specialist
+    # responses at the end differ between two reviews for the same writer role
     prompt = f"""You are the Editor-in-Chief for MECCA, synthesizing feedback from multiple AI editorial specialists. Your goal is providing actionable guidance that helps writers improve while teaching appropriate skepticism about AI capabilities.
 
-CONTEXT: {context_string}
-
-SPECIALIST RESPONSES TO SYNTHESIZE:
-GPT-4 Response: {gpt_response}
-Gemini Response: {gemini_response}
-Perplexity Response: {perplexity_response}
-
 OUTPUT STRUCTURE - CLEAN FORMAT WITHOUT HTML MARKERS:
 
 🎯 PRIORITY ACTIONS
@@ -597,16 +681,179 @@ PRIORITY RANKING:
 3. Style issues that affect professional presentation
 4. Grammar/mechanical issues
 
-Remember: Your role is helping writers improve their current piece while building long-term editorial judgment. Focus on actionable guidance with embedded learning rather than abstract lessons."""
+Remember: Your role is helping writers improve their current piece while building long-term editorial judgment. Focus on actionable guidance with embedded learning rather than abstract lessons.
+
+CONTEXT: {slot("context_string")}
+
+SPECIALIST RESPONSES TO SYNTHESIZE:
+GPT-4 Response: {slot("gpt_response")}
+Gemini Response: {slot("gemini_response")}
+Perplexity Response: {slot("perplexity_response")}"""
 
     return prompt
 
+# Stand-in for the Custom FCC response when the EiC starts before verification coaching finishes
+PENDING_FCC_NOTE = (
+    "[SPECIALIST STILL RUNNING - Custom FCC verification coaching has not finished yet. "
+    "Do not guess at its findings; base fact-checking guidance on the other specialists. "
+    "A verification addendum will follow once it completes.]"
+)
+
+def build_eic_synthesis_request(content_mode, gpt_response, gemini_response, custom_fcc_response, writer_role, context):
+    """
+    Build the (system prompt, user message) pair for the EiC synthesis call.
+    The synthesis prompt already embeds every specialist response, so the user
+    message only asks for the synthesis instead of repeating them. Returns a
+    token report comparing this against the old duplicated request.
+    Pass custom_fcc_response=None to start the synthesis before the Custom FCC
+    has finished; its findings then arrive via build_eic_addendum_request.
+    """
+    # Provider errors are not editorial feedback - mark them so the EiC does not synthesize them as content
+    gpt_response, gemini_response = [
+        f"[SPECIALIST UNAVAILABLE - no feedback from this specialist. Reason: {response}]" if is_failure(response) else response
+        for response in (gpt_response, gemini_response)
+    ]
+    if custom_fcc_response is None:
+        custom_fcc_response = PENDING_FCC_NOTE
+    elif is_failure(custom_fcc_response):
+        custom_fcc_response = f"[SPECIALIST UNAVAILABLE - no feedback from this specialist. Reason: {custom_fcc_response}]"
+    
+    if content_mode == "story":
+        system_prompt = get_story_eic_synthesis_prompt(gpt_response, gemini_response, custom_fcc_response, writer_role, context)
+        user_message = "Produce the story conference assessment for this concept, using the specialist evaluations provided above."
+        legacy_message = f"""
+GPT-4 Story Analysis:
+{gpt_response}
+
+Gemini Story Analysis:
+{gemini_response}
+
+Custom FCC Analysis:
+{custom_fcc_response}
+                """
+    else:
+        # Gemini's corrections go in as compact parsed records rather than the raw line format
+        gemini_report = parse_error_report(gemini_response)
+        if gemini_report is not None:
+            gemini_for_synthesis = (
+                "Mechanical corrections, one per line as P<paragraph> TYPE: wrong → fix. Lines marked "
+                "(local pre-check) come from MECCA's rule-based scan, not Gemini - do not credit Gemini with them.\n"
+                f"{gemini_report.to_compact()}"
+            )
+            if LOCAL_ONLY_NOTE in gemini_response:
+                gemini_for_synthesis = f"{LOCAL_ONLY_NOTE}\n{gemini_for_synthesis}"
+        else:
+            gemini_for_synthesis = gemini_response
+        system_prompt = get_eic_synthesis_prompt_v3(gpt_response, gemini_for_synthesis, "", custom_fcc_response, writer_role, context)
+        user_message = "Synthesize the specialist responses provided above into the Editor-in-Chief feedback, following the output structure."
+        legacy_message = f"""
+GPT-4 Editor Response:
+{gpt_response}
+
+Gemini Editor Response:
+{gemini_response}
+
+Custom FCC Response:
+{custom_fcc_response}
+            """
+    
+    system_tokens = estimate_tokens(system_prompt)
+    token_report = {
+        "before": system_tokens + estimate_tokens(legacy_message),
+        "after": system_tokens + estimate_tokens(user_message)
+    }
+    token_report["saved"] = token_report["before"] - token_report["after"]
+    
+    return system_prompt, user_message, token_report
+
+def build_eic_addendum_request(content_mode, eic_synthesis, custom_fcc_response, writer_role, context):
+    """
+    Build the (system prompt, user message) pair for the verification addendum
+    that follows an early EiC synthesis once the Custom FCC result arrives.
+    The addendum confirms, corrects or extends the synthesis rather than repeating it.
+    """
+    if content_mode == "story":
+        piece = "story concept"
+        focus = "reporting and verification plan"
+    else:
+        piece = "article"
+        focus = "fact-checking priorities"
+    
+    if writer_role == "student":
+        tone_note = "Keep the guidance instructive - explain why each verification step matters."
+    else:
+        tone_note = "Keep the guidance direct and practical."
+    
+    system_prompt = f"""You are the Editor-in-Chief for MECCA. You have already given the writer your synthesis of the specialist feedback on their {piece}, written before the Custom Fact-Checking Coach (Custom FCC) had finished. Its verification coaching has now arrived.
+
+YOUR EARLIER SYNTHESIS:
+{eic_synthesis}
+
+CUSTOM FCC RESPONSE:
+{custom_fcc_response}
+
+CONTEXT: {context.get('target_audience', 'General readers')}
+
+Write a short VERIFICATION ADDENDUM that updates your {focus}:
+• Confirm the points in your synthesis that the Custom FCC supports
+• Correct anything in your synthesis that the Custom FCC contradicts - say plainly what changed and why
+• Add verification steps or claims to check that your synthesis did not cover
+• Note where the Custom FCC's search results look thin or unreliable - it can be wrong too
+
+FORMAT:
+🔍 VERIFICATION ADDENDUM
+• [CONFIRMED / REVISED / NEW] Specific point → Brief explanation
+
+Do not repeat the rest of your synthesis. Quote the Custom FCC exactly when referencing it. {tone_note}"""
+    
+    user_message = "Write the verification addendum for your earlier synthesis, using the Custom FCC response provided above."
+    
+    return system_prompt, user_message
+
+def get_dialogue_summary_prompt(current_summary, exchanges):
+    """Prompt that folds newly evicted dialogue exchanges into the running conversation summary"""
+    
+    transcript = "\n\n".join(
+        f"WRITER: {exchange['question']}\nEDITOR-IN-CHIEF: {exchange['answer']}"
+        for exchange in exchanges
+    )
+    
+    prompt = f"""You maintain a running summary of an editorial dialogue between a writer and MECCA's Editor-in-Chief. The summary replaces older exchanges in the Editor's context, so it must preserve what matters for continuing the conversation.
+
+CURRENT SUMMARY:
+{current_summary or "(none yet - this is the start of the conversation)"}
+
+NEW EXCHANGES TO ADD:
+{transcript}
+
+Return the updated summary only. Keep everything in the current summary that still matters and add the new exchanges:
+• Questions the writer asked and the Editor's answers, including specific paragraph references and recommended changes
+• Decisions the writer made or said they would make
+• Any specialist finding the Editor corrected, conceded or disputed
+• Open questions the writer has not resolved
+
+Use short bullet points, no more than 250 words in total. Do not add advice that was not given."""
+    
+    return prompt
+
 def get_enhanced_dialogue_system_prompt_v2(gpt_response, gemini_response, perplexity_response, original_article, context):
     """Enhanced dialogue system prompt with maximum transparency enforcement"""
     
     # Check if this is story mode or article mode
     content_mode = context.get('content_type') == 'story_idea' or 'story' in str(context.get('content_mode', ''))
     
+    template = prompt_templates.get("dialogue_system", (content_mode,), _dialogue_system_template)
+    return template.render({
+        "original_article": original_article,
+        "review_context": str(context),
+        "gpt_response": gpt_response,
+        "gemini_response": gemini_response,
+        "perplexity_response": perplexity_response
+    })
+
+def _dialogue_system_template(content_mode):
+    """Dialogue system prompt text for story or article mode, with slots for the article, context and specialist responses"""
+    
     if content_mode:
         dialogue_context = """
 You are the Editor-in-Chief who just conducted a story conference evaluation. The writer may ask about:
@@ -643,16 +890,16 @@ TRANSPARENCY PROTOCOLS - CRITICAL:
 5. Treat AI errors as normal data points - worth noting and learning from
 
 ORIGINAL CONTENT CONTEXT:
-{original_article}
+{slot("original_article")}
 
-REVIEW CONTEXT: {context}
+REVIEW CONTEXT: {slot("review_context")}
 
 SPECIALIST RESPONSES FOR REFERENCE:
-GPT-4 RESPONSE: {gpt_response}
+GPT-4 RESPONSE: {slot("gpt_response")}
 
-GEMINI RESPONSE: {gemini_response}
+GEMINI RESPONSE: {slot("gemini_response")}
 
-PERPLEXITY RESPONSE: {perplexity_response}
+PERPLEXITY RESPONSE: {slot("perplexity_response")}
 
 REPORTER STORY - Internal Conditioning Only:
 You follow the principles of accuracy over authority, like a careful reporter who consistently reports exactly what sources actually said rather than making confident assertions beyond the facts. This builds lasting credibility.
@@ -3,8 +3,18 @@
 
 import streamlit as st
 import os
+import time
+from concurrent.futures import as_completed
 from datetime import datetime
 from mecca_natural_calls import call_openai_gpt4, call_anthropic_claude, call_google_gemini, call_perplexity
+from core.parallel import dispatch_specialists
+
+MODEL_CALLS = {
+    "GPT-4": call_openai_gpt4,
+    "Gemini": call_google_gemini,
+    "Claude": call_anthropic_claude,
+    "Perplexity": call_perplexity
+}
 
 # Page configuration
 st.set_page_config(
@@ -85,77 +95,110 @@ def main():
             st.error("Please select at least one model.")
             return
         
-        # Show progress
-        with st.spinner(f"Querying {len(models_to_query)} models..."):
-            responses = {}
-            
-            # Query each selected model
-            for model in models_to_query:
-                try:
-                    if model == "GPT-4":
-                        responses["GPT-4"] = call_openai_gpt4(query_text)
-                    elif model == "Gemini":
-                        responses["Gemini"] = call_google_gemini(query_text)
-                    elif model == "Claude":
-                        responses["Claude"] = call_anthropic_claude(query_text)
-                    elif model == "Perplexity":
-                        responses["Perplexity"] = call_perplexity(query_text)
-                except Exception as e:
-                    responses[model] = f"Error: {str(e)}"
-            
-            # Display results
-            st.success(f"Received responses from {len(responses)} models!")
-            
-            # Add timestamp if requested
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if include_timestamp else None
-            
-            if display_mode == "Side by Side":
-                display_side_by_side(responses, timestamp)
-            elif display_mode == "Sequential":
-                display_sequential(responses, timestamp)
-            else:  # Comparison View
-                display_comparison_view(responses, query_text, timestamp)
-            
-            # Save responses if requested
-            if save_responses:
-                save_to_file(query_text, responses, timestamp)
-                st.success("Responses saved to mmqt_responses.txt")
+        # Query every selected model at once - the wait is the slowest model, not the sum
+        started = time.monotonic()
+        futures = query_models(models_to_query, query_text)
+        
+        # Add timestamp if requested
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if include_timestamp else None
+        
+        # Each response is shown as soon as its model answers
+        if display_mode == "Side by Side":
+            responses, timings = display_side_by_side(futures, timestamp)
+        elif display_mode == "Sequential":
+            responses, timings = display_sequential(futures, timestamp)
+        else:  # Comparison View
+            responses, timings = display_comparison_view(futures, query_text, timestamp)
+        
+        st.success(f"Received responses from {len(responses)} models in {time.monotonic() - started:.1f}s!")
+        
+        # Save responses if requested
+        if save_responses:
+            save_to_file(query_text, responses, timestamp, timings)
+            st.success("Responses saved to mmqt_responses.txt")
+
+def _timed_call(call, query):
+    """Run one model call, returning (response, seconds taken)"""
+    started = time.monotonic()
+    try:
+        response = call(query)
+    except Exception as e:
+        response = f"Error: {str(e)}"
+    return response, time.monotonic() - started
+
+def query_models(models, query):
+    """Start a query to every selected model at once; returns model -> Future of (response, seconds)"""
+    return dispatch_specialists({model: (_timed_call, (MODEL_CALLS[model], query)) for model in models})
+
+def show_as_completed(futures, slots, render):
+    """
+    Fill each model's placeholder as soon as that model answers.
+    `render(model, response, seconds)` draws one response; returns (responses, timings) in selection order.
+    """
+    for model, slot in slots.items():
+        slot.info(f"⏳ Waiting for {model}...")
+    
+    models_by_future = {future: model for model, future in futures.items()}
+    results = {}
+    for future in as_completed(models_by_future):
+        model = models_by_future[future]
+        results[model] = future.result()
+        with slots[model].container():
+            render(model, *results[model])
+    
+    responses = {model: results[model][0] for model in futures}
+    timings = {model: results[model][1] for model in futures}
+    return responses, timings
 
-def display_side_by_side(responses, timestamp=None):
-    """Display responses in columns side by side"""
+def display_side_by_side(futures, timestamp=None):
+    """Display responses in columns side by side, each as soon as it arrives"""
     st.markdown("## 🔄 Model Responses")
     
     if timestamp:
         st.markdown(f"*Query timestamp: {timestamp}*")
     
     # Create columns based on number of models
-    num_models = len(responses)
+    num_models = len(futures)
     if num_models <= 2:
         cols = st.columns(num_models)
     else:
         # For 3+ models, use 2 columns and stack
         cols = st.columns(2)
     
-    for i, (model, response) in enumerate(responses.items()):
+    slots = {}
+    for i, model in enumerate(futures):
         col_index = i % len(cols)
         with cols[col_index]:
             st.markdown(f"### 🤖 {model}")
-            st.markdown('<div class="model-response">', unsafe_allow_html=True)
-            st.markdown(response)
-            st.markdown('</div>', unsafe_allow_html=True)
+            slots[model] = st.empty()
+    
+    def render(model, response, seconds):
+        st.caption(f"⏱️ {seconds:.1f}s")
+        st.markdown('<div class="model-response">', unsafe_allow_html=True)
+        st.markdown(response)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    return show_as_completed(futures, slots, render)
 
-def display_sequential(responses, timestamp=None):
-    """Display responses one after another"""
+def display_sequential(futures, timestamp=None):
+    """Display responses one after another, each as soon as it arrives"""
     st.markdown("## 📋 Model Responses")
     
     if timestamp:
         st.markdown(f"*Query timestamp: {timestamp}*")
     
-    for model, response in responses.items():
+    slots = {}
+    for model in futures:
         with st.expander(f"🤖 {model} Response", expanded=True):
-            st.markdown(response)
+            slots[model] = st.empty()
+    
+    def render(model, response, seconds):
+        st.caption(f"⏱️ {seconds:.1f}s")
+        st.markdown(response)
+    
+    return show_as_completed(futures, slots, render)
 
-def display_comparison_view(responses, query, timestamp=None):
+def display_comparison_view(futures, query, timestamp=None):
     """Display responses in a comparison-focused format"""
     st.markdown("## 🔍 Comparison Analysis")
     
@@ -168,9 +211,14 @@ def display_comparison_view(responses, query, timestamp=None):
     st.markdown(f"*{query}*")
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Display each response with analysis prompts
-    for model, response in responses.items():
+    # Display each response with analysis prompts, in selection order as each arrives
+    slots = {}
+    for model in futures:
+        slots[model] = st.empty()
+    
+    def render(model, response, seconds):
         st.markdown(f"### 🤖 {model}")
+        st.caption(f"⏱️ {seconds:.1f}s")
         st.markdown(response)
         
         # Add quick analysis buttons
@@ -186,8 +234,10 @@ def display_comparison_view(responses, query, timestamp=None):
                 st.info(f"Response rating interface for {model} would go here")
         
         st.markdown("---")
+    
+    return show_as_completed(futures, slots, render)
 
-def save_to_file(query, responses, timestamp=None):
+def save_to_file(query, responses, timestamp=None, timings=None):
     """Save query and responses to a text file"""
     filename = "mmqt_responses.txt"
     
@@ -199,7 +249,10 @@ def save_to_file(query, responses, timestamp=None):
         f.write("=" * 80 + "\n\n")
         
         for model, response in responses.items():
-            f.write(f"{model.upper()} RESPONSE:\n")
+            if timings and model in timings:
+                f.write(f"{model.upper()} RESPONSE ({timings[model]:.1f}s):\n")
+            else:
+                f.write(f"{model.upper()} RESPONSE:\n")
             f.write("-" * 40 + "\n")
             f.write(f"{response}\n\n")
         
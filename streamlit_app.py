@@ -1,11 +1,22 @@
 import streamlit as st
+import inspect
 import os
+import time
 from temp_forms import render_user_context_form, render_article_input, render_story_conference_form
-from mecca_dialogue_prototype_calls import call_openai, call_anthropic, call_google, enhanced_dialogue_handler
-from mecca_dialogue_prototype_prompts import get_editorial_prompt, get_eic_synthesis_prompt_v3, get_story_conference_prompt, get_story_eic_synthesis_prompt
+from mecca_dialogue_prototype_calls import SPECIALIST_LABELS, STREAM_ERROR_PREFIX, call_openai, call_google, stream_anthropic, enhanced_dialogue_handler_v2_stream, update_dialogue_summary, session_quote_matcher
+from mecca_dialogue_prototype_prompts import get_editorial_prompt, get_gemini_error_detection_utility, get_story_conference_prompt, build_eic_synthesis_request, build_eic_addendum_request
 from ui.styles import load_custom_styles
-from core.session_manager import initialize_session_state, reset_analysis_state
+from core.session_manager import get_session, initialize_session_state, reset_analysis_state, save_session, session_memory_report
+from core.session_records import append_exchange, entries_from
+from core.error_records import LOCAL_ONLY_NOTE, LOCAL_SOURCE, parse_error_report
+from core.mechanical_checks import is_local_only, local_only_scan, records_in_range, scan_mechanical_errors, with_local_findings
+from core.chunking import needs_chunking, prepare_chunks, review_in_chunks, merge_error_reports, merge_section_reviews
+from core.prompt_budget import prompt_reports
+from core.parallel import attach_late_results, collect_available, dispatch_specialists
+from core.resilience import ProviderFailure, is_failure
+from core.scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, request_context, get_scheduler_stats
 from custom_fcc import call_custom_fcc_integrated
+from async_calls import acall_google, acall_openai, submit
 
 # Configure page
 st.set_page_config(
@@ -17,6 +28,113 @@ st.set_page_config(
 
 # Initialize session state
 initialize_session_state()
+session = get_session()
+
+def stream_eic_synthesis(eic_prompt, eic_request, anthropic_key):
+    """Show the EiC synthesis live as tokens arrive, returning the completed text"""
+    if not anthropic_key:
+        return "Anthropic API key not configured"
+    
+    live_preview = st.empty()
+    with live_preview.container():
+        st.markdown("#### ✍️ Editor-in-Chief is writing...")
+        eic_text = st.write_stream(stream_anthropic(eic_prompt, eic_request, anthropic_key))
+    
+    # The finished synthesis is displayed in the results tabs below
+    live_preview.empty()
+    return eic_text.strip()
+
+def early_eic_enabled():
+    """Start the EiC once GPT and Gemini are in, adding the Custom FCC as an addendum (on by default)"""
+    setting = st.secrets.get("EARLY_EIC_START") or os.getenv("MECCA_EARLY_EIC", "true")
+    return str(setting).lower() in ("1", "true", "yes")
+
+def dispatch_review(specialist_calls):
+    """
+    Start every specialist call at once. Async adapters (async_calls) run on the shared
+    event loop and the rest on the specialist thread pool; both give futures for collect_available.
+    """
+    return {
+        name: submit(fn(*args)) if inspect.iscoroutinefunction(fn) else dispatch_specialists({name: (fn, args)})[name]
+        for name, (fn, args) in specialist_calls.items()
+    }
+
+def synthesis_failed(eic_text):
+    """True when a streamed EiC synthesis is missing or ended in a provider error"""
+    return is_failure(eic_text) or not eic_text or STREAM_ERROR_PREFIX in eic_text
+
+def run_editorial_review(content_mode, specialist_calls, writer_role, context, anthropic_key):
+    """
+    Run the specialists and the EiC synthesis, returning (editor_responses, eic_text,
+    token_report, pending). Each specialist has its own deadline; one that misses it is
+    marked as unavailable for the synthesis and its still-running future is returned in
+    `pending` so the result can be attached when it arrives.
+    In early-start mode the EiC synthesizes as soon as the fast specialists finish, stays
+    on screen while the Custom FCC is still searching, then appends a verification addendum.
+    If that early synthesis fails, a full synthesis runs instead once the Custom FCC is in.
+    """
+    started = time.monotonic()
+    futures = dispatch_review(specialist_calls)
+    fcc_future = None
+    if early_eic_enabled() and anthropic_key and len(futures) > 1:
+        fcc_future = futures.pop("custom_fcc", None)
+    
+    specialist_results, pending = collect_available(futures, started=started)
+    gpt_response = specialist_results.get("gpt", ProviderFailure("OpenAI API key not configured"))
+    gemini_response = specialist_results.get("gemini", ProviderFailure("Google API key not configured"))
+    
+    if fcc_future is None:
+        custom_fcc_response = specialist_results.get("custom_fcc", ProviderFailure("Custom FCC configuration incomplete"))
+        eic_prompt, eic_request, token_report = build_eic_synthesis_request(
+            content_mode, gpt_response, gemini_response, custom_fcc_response, writer_role, context
+        )
+        eic_text = stream_eic_synthesis(eic_prompt, eic_request, anthropic_key)
+    else:
+        eic_prompt, eic_request, token_report = build_eic_synthesis_request(
+            content_mode, gpt_response, gemini_response, None, writer_role, context
+        )
+        live_preview = st.empty()
+        with live_preview.container():
+            st.markdown("#### ✍️ Editor-in-Chief is writing...")
+            eic_text = st.write_stream(stream_anthropic(eic_prompt, eic_request, anthropic_key)).strip()
+            early_failed = synthesis_failed(eic_text)
+            
+            if early_failed:
+                pending_note = st.info("🔍 Custom FCC is still verifying claims - the Editor-in-Chief will try again with all specialists once it is in.")
+            else:
+                pending_note = st.info("🔍 Custom FCC is still verifying claims - a verification addendum will follow.")
+            # The FCC has been running alongside everything above, so its deadline still counts from dispatch
+            fcc_results, fcc_pending = collect_available({"custom_fcc": fcc_future}, started=started)
+            custom_fcc_response = fcc_results["custom_fcc"]
+            pending.update(fcc_pending)
+            pending_note.empty()
+            
+            if early_failed:
+                addendum = None
+            elif is_failure(custom_fcc_response):
+                addendum = f"🔍 VERIFICATION ADDENDUM\n\nCustom FCC verification coaching was unavailable ({custom_fcc_response}), so the fact-checking guidance above has not been cross-checked against search results."
+            else:
+                addendum_prompt, addendum_request = build_eic_addendum_request(
+                    content_mode, eic_text, custom_fcc_response, writer_role, context
+                )
+                addendum = st.write_stream(stream_anthropic(addendum_prompt, addendum_request, anthropic_key)).strip()
+        
+        live_preview.empty()
+        if early_failed:
+            # Nothing to add an addendum to - synthesize from all three specialists instead
+            eic_prompt, eic_request, token_report = build_eic_synthesis_request(
+                content_mode, gpt_response, gemini_response, custom_fcc_response, writer_role, context
+            )
+            eic_text = stream_eic_synthesis(eic_prompt, eic_request, anthropic_key)
+        else:
+            eic_text = f"{eic_text}\n\n---\n\n{addendum}"
+    
+    editor_responses = {
+        "gpt": gpt_response,
+        "gemini": gemini_response,
+        "custom_fcc": custom_fcc_response
+    }
+    return editor_responses, eic_text, token_report, pending
 
 # Load custom styles
 st.markdown(load_custom_styles(), unsafe_allow_html=True)
@@ -88,7 +206,7 @@ if content_mode == "Story Idea (pitch/concept)":
         else:
             # Reset analysis state for new story conference
             reset_analysis_state()
-            st.session_state.content_mode = "story"
+            session.content_mode = "story"
             
             with st.spinner("🤖 Editorial team evaluating your story concept..."):
                 
@@ -112,8 +230,8 @@ if content_mode == "Story Idea (pitch/concept)":
                 }
                 
                 # Store in session state
-                st.session_state.context = story_context
-                st.session_state.original_article = story_data["story_content"]
+                session.context = story_context
+                session.original_article = story_data["story_content"]
                 
                 # Map writer role
                 role_mapping = {
@@ -125,42 +243,39 @@ if content_mode == "Story Idea (pitch/concept)":
                 }
                 mapped_role = role_mapping.get(story_data["writer_role"], "other")
                 
-                # Call models with story conference prompts
-                gpt_response = call_openai(get_story_conference_prompt("gpt-4o", story_data, mapped_role, story_context), openai_key) if openai_key else "OpenAI API key not configured"
-                gemini_response = call_google(get_story_conference_prompt("gemini", story_data, mapped_role, story_context), google_key) if google_key else "Google API key not configured"
+                # Dispatch all specialists at once with story conference prompts
+                specialist_calls = {}
+                if openai_key:
+                    specialist_calls["gpt"] = (acall_openai, (get_story_conference_prompt("gpt-4o", story_data, mapped_role, story_context), openai_key))
+                if google_key:
+                    specialist_calls["gemini"] = (acall_google, (get_story_conference_prompt("gemini", story_data, mapped_role, story_context), google_key))
                 
                 # Use Custom FCC instead of Perplexity
-                custom_fcc_response = call_custom_fcc_integrated(
-                    get_story_conference_prompt("perplexity", story_data, mapped_role, story_context), 
-                    openai_key, 
-                    google_search_key, 
-                    google_search_engine_id
-                ) if openai_key and google_search_key and google_search_engine_id else "Custom FCC configuration incomplete"
-                
-                # Store responses
-                st.session_state.editor_responses = {
-                    "gpt": gpt_response,
-                    "gemini": gemini_response, 
-                    "custom_fcc": custom_fcc_response
-                }
+                if openai_key and google_search_key and google_search_engine_id:
+                    specialist_calls["custom_fcc"] = (call_custom_fcc_integrated, (
+                        get_story_conference_prompt("perplexity", story_data, mapped_role, story_context), 
+                        openai_key, 
+                        google_search_key, 
+                        google_search_engine_id
+                    ))
                 
-                # EiC synthesis for story conference
-                claude_eic_prompt = get_story_eic_synthesis_prompt(gpt_response, gemini_response, custom_fcc_response, mapped_role, story_context)
-                combined_analysis = f"""
-GPT-4 Story Analysis:
-{gpt_response}
-
-Gemini Story Analysis:
-{gemini_response}
-
-Custom FCC Analysis:
-{custom_fcc_response}
-                """
+                # EiC synthesis for story conference - starts as soon as the fast specialists are in
+                with request_context(session.session_id, PRIORITY_BATCH):
+                    editor_responses, claude_response, eic_token_report, pending = run_editorial_review(
+                        "story", specialist_calls, mapped_role, story_context, anthropic_key
+                    )
                 
-                claude_response = call_anthropic(claude_eic_prompt, combined_analysis, anthropic_key) if anthropic_key else "Anthropic API key not configured"
+                # Store responses
+                session.editor_responses = editor_responses
+                session.eic_token_report = eic_token_report
+                session.prompt_reports = prompt_reports(specialist_calls)
+                session.pending_specialists = pending
+                # Prepare the dialogue quote checks while the user reads the synthesis
+                session_quote_matcher(session)
                 
-                st.session_state.eic_summary = claude_response
-                st.session_state.has_analysis = True
+                session.eic_summary = claude_response
+                session.has_analysis = True
+                save_session()
 
 else:
     # Article Editing Mode (existing functionality)
@@ -171,7 +286,7 @@ else:
     if analyze_button and article_text.strip():
         # Reset dialogue history and analysis state for new analysis
         reset_analysis_state()
-        st.session_state.content_mode = "article"
+        session.content_mode = "article"
         
         with st.spinner("🤖 Your enhanced editorial team is reviewing your article..."):
             
@@ -197,8 +312,8 @@ else:
             }
             
             # Store in session state for dialogue
-            st.session_state.context = context
-            st.session_state.original_article = f"HEADLINE: {headline}\n\n{article_text}"
+            session.context = context
+            session.original_article = f"HEADLINE: {headline}\n\n{article_text}"
             
             # Map writer role to expected format
             role_mapping = {
@@ -210,50 +325,77 @@ else:
             }
             mapped_role = role_mapping.get(form_data["writer_role"], "other")
             
-            # Call individual models with enhanced prompts
-            gpt_response = call_openai(get_editorial_prompt("gpt-4o", article_text, mapped_role, context), openai_key) if openai_key else "OpenAI API key not configured"
-            gemini_response = call_google(get_editorial_prompt("gemini", article_text, mapped_role, context), google_key) if google_key else "Google API key not configured"
+            # Dispatch all specialists at once with enhanced prompts - latency is the slowest one, not the sum
+            specialist_calls = {}
+            
+            # Local pre-pass for mechanical errors - Gemini is told what it found and only looks for the rest
+            local_errors = scan_mechanical_errors(article_text)
+            
+            if needs_chunking(article_text):
+                # Long article: GPT-4 and Gemini review paragraph-numbered sections in parallel and their findings are merged
+                chunks = prepare_chunks(article_text, headline)
+                st.info(f"📚 Long article - reviewing it in {len(chunks)} sections in parallel.")
+                if openai_key:
+                    gpt_prompts = [(chunk, get_editorial_prompt("gpt-4o", chunk["prompt_text"], mapped_role, context)) for chunk in chunks]
+                    specialist_calls["gpt"] = (review_in_chunks, (call_openai, gpt_prompts, openai_key, merge_section_reviews))
+                if google_key:
+                    gemini_prompts = [
+                        (chunk, get_gemini_error_detection_utility(
+                            chunk["prompt_text"], records_in_range(local_errors, chunk["first_para"], chunk["last_para"])
+                        ))
+                        for chunk in chunks
+                    ]
+                    specialist_calls["gemini"] = (with_local_findings, (
+                        review_in_chunks, local_errors, call_google, gemini_prompts, google_key, merge_error_reports
+                    ))
+            else:
+                if openai_key:
+                    specialist_calls["gpt"] = (acall_openai, (get_editorial_prompt("gpt-4o", article_text, mapped_role, context), openai_key))
+                if is_local_only(article_text):
+                    # Very short text - the local scan is all the copy-editing pass needs
+                    specialist_calls["gemini"] = (local_only_scan, (local_errors,))
+                elif google_key:
+                    specialist_calls["gemini"] = (with_local_findings, (
+                        call_google, local_errors, get_gemini_error_detection_utility(article_text, local_errors), google_key
+                    ))
             
             # Use Custom FCC instead of Perplexity
-            custom_fcc_response = call_custom_fcc_integrated(
-                get_editorial_prompt("perplexity", article_text, mapped_role, context), 
-                openai_key, 
-                google_search_key, 
-                google_search_engine_id
-            ) if openai_key and google_search_key and google_search_engine_id else "Custom FCC configuration incomplete"
+            if openai_key and google_search_key and google_search_engine_id:
+                specialist_calls["custom_fcc"] = (call_custom_fcc_integrated, (
+                    get_editorial_prompt("perplexity", article_text, mapped_role, context), 
+                    openai_key, 
+                    google_search_key, 
+                    google_search_engine_id
+                ))
             
-            # Store editor responses in session state
-            st.session_state.editor_responses = {
-                "gpt": gpt_response,
-                "gemini": gemini_response,
-                "custom_fcc": custom_fcc_response
-            }
+            # Call Claude as Editor-in-Chief - it starts once GPT and Gemini are in, with the Custom FCC added as it lands
+            with request_context(session.session_id, PRIORITY_BATCH):
+                editor_responses, claude_response, eic_token_report, pending = run_editorial_review(
+                    "article", specialist_calls, mapped_role, context, anthropic_key
+                )
             
-            # Prepare combined responses for EiC
-            combined_analysis = f"""
-GPT-4 Editor Response:
-{gpt_response}
-
-Gemini Editor Response:
-{gemini_response}
-
-Custom FCC Response:
-{custom_fcc_response}
-            """
+            # Store editor responses in session state
+            session.editor_responses = editor_responses
+            session.eic_token_report = eic_token_report
+            session.prompt_reports = prompt_reports(specialist_calls)
+            session.pending_specialists = pending
+            # Prepare the dialogue quote checks while the user reads the synthesis
+            session_quote_matcher(session)
             
-            # Call Claude as Editor-in-Chief with enhanced synthesis
-            claude_eic_prompt = get_eic_synthesis_prompt_v3(gpt_response, gemini_response, "", custom_fcc_response, mapped_role, context)
-            claude_response = call_anthropic(claude_eic_prompt, combined_analysis, anthropic_key) if anthropic_key else "Anthropic API key not configured"
+            # Parse Gemini's correction lines once; the validator and display use the records
+            gemini_response = editor_responses["gemini"]
+            session.gemini_errors = None if is_failure(gemini_response) else parse_error_report(gemini_response)
             
             # Store EiC response for dialogue
-            st.session_state.eic_summary = claude_response
-            st.session_state.has_analysis = True
+            session.eic_summary = claude_response
+            session.has_analysis = True
+            save_session()
 
     elif analyze_button:
         st.warning("⚠️ Please enter some article text to analyze.")
 
 # Display results with tabbed interface
-if st.session_state.has_analysis:
+if session.has_analysis:
     # Enhanced AI Disclaimer
     st.markdown("""
     <div class="ai-disclaimer">
@@ -263,17 +405,29 @@ if st.session_state.has_analysis:
     """, unsafe_allow_html=True)
 
     # Dynamic header based on mode
-    if st.session_state.get('content_mode') == 'story':
+    if session.get('content_mode') == 'story':
         st.markdown('<div class="section-header">📋 Editorial Story Conference Results</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="section-header">📋 Your Editorial Feedback</div>', unsafe_allow_html=True)
     
     # Initialize tab state if not exists
-    if 'active_tab' not in st.session_state:
-        st.session_state.active_tab = 0
+    if 'active_tab' not in session:
+        session.active_tab = 0
+    
+    # Attach any specialist that missed its deadline but has finished since
+    if session.pending_specialists:
+        arrived = attach_late_results(session.pending_specialists, session.editor_responses)
+        if arrived:
+            session.late_specialists.extend(arrived)
+            if "gemini" in arrived and session.get('content_mode') != 'story' and not is_failure(session.editor_responses["gemini"]):
+                session.gemini_errors = parse_error_report(session.editor_responses["gemini"])
+            # Rebuild the dialogue prompt and quote checks so the editor can discuss the late feedback
+            session.dialogue_system_prompt = ""
+            session.quote_matcher = None
+            save_session()
     
     # Create tabs for organized feedback display
-    if st.session_state.get('content_mode') == 'story':
+    if session.get('content_mode') == 'story':
         tab1, tab2, tab3 = st.tabs([
             "🎯 Editorial Assessment", 
             "📋 Specialist Perspectives", 
@@ -287,7 +441,7 @@ if st.session_state.has_analysis:
         ])
     
     with tab1:
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.markdown("## 🎯 Editor-in-Chief Story Assessment")
             st.markdown("*Editorial evaluation using story conference principles*")
         else:
@@ -295,10 +449,26 @@ if st.session_state.has_analysis:
             st.markdown("*Synthesis of all editorial feedback using the 'embarrassment test' for prioritization*")
         
         # Display EiC content directly
-        st.markdown(st.session_state.eic_summary)
+        st.markdown(session.eic_summary)
+        
+        eic_token_report = session.get('eic_token_report')
+        if eic_token_report:
+            st.caption(
+                f"Synthesis input: ~{eic_token_report['after']:,} tokens "
+                f"(~{eic_token_report['saved']:,} saved by sending each specialist response once)"
+            )
+        
+        specialist_names = {"gpt": "GPT-4", "gemini": "Gemini", "custom_fcc": "Custom FCC"}
+        if session.pending_specialists:
+            waiting = ", ".join(specialist_names.get(name, name) for name in session.pending_specialists)
+            st.info(f"⏳ Still waiting on {waiting} - this synthesis was written without it. Late feedback will be attached to the individual responses when it arrives.")
+            st.button("🔄 Check for late results", key="check_late_results")
+        if session.late_specialists:
+            arrived = ", ".join(specialist_names.get(name, name) for name in session.late_specialists)
+            st.info(f"⏱️ {arrived} arrived after this synthesis was written - see the individual responses, or ask the Editor about it.")
         
         # Encourage dialogue immediately after EiC feedback
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.info("""
             💬 **Continue the story conference!** Use the "Ask the Editor" tab to explore:
             • Why did the Editor-in-Chief reach this assessment?
@@ -317,23 +487,42 @@ if st.session_state.has_analysis:
             """)
     
     with tab2:
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.markdown("## 📋 Specialist Story Perspectives")
             st.markdown("*Compare how different editorial specialists evaluated your story concept*")
         else:
             st.markdown("## Full Individual Responses")
             st.markdown("*Compare all specialist feedback side by side - transparency is key to learning AI limitations.*")
         
+        if session.prompt_reports:
+            with st.expander("📏 Prompt sizes"):
+                for name, report in session.prompt_reports.items():
+                    estimate = "" if report["exact"] else "~"
+                    st.markdown(
+                        f"**{specialist_names.get(name, name)}:** {estimate}{report['total_tokens']:,} of "
+                        f"{report['budget']:,} tokens"
+                    )
+                    trimmed = [f"{section['name']} ({section['action']})" for section in report["sections"] if section["action"] != "kept"]
+                    if trimmed:
+                        st.caption(f"Trimmed to fit: {', '.join(trimmed)}")
+                    if report.get("over_limit"):
+                        st.warning(
+                            f"Longer than {specialist_names.get(name, name)} can take ({report['input_limit']:,} tokens) - "
+                            "shorten the text and run the review again."
+                        )
+                    elif report["over_budget"]:
+                        st.caption("Above the size target - the required instructions and text were sent in full rather than cut.")
+        
         # Search bar for responses
         search_query = st.text_input("🔍 Search within responses:", placeholder="Search for specific terms across all responses...", key="response_search")
         
         # Three-column layout for specialist responses
-        editor_responses = st.session_state.editor_responses
+        editor_responses = session.editor_responses
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 st.markdown("#### 📊 GPT-4 (Comprehensive Analysis)")
                 st.markdown("**Focus:** Story viability, evidence gaps, editorial judgment")
             else:
@@ -341,15 +530,17 @@ if st.session_state.has_analysis:
                 st.markdown("**Focus:** Organization, structure, comprehensive review")
             
             gpt_content = editor_responses.get("gpt", "Response not available")
+            if "gpt" in session.late_specialists:
+                st.caption("⏱️ Arrived after the Editor-in-Chief synthesis")
             if search_query and search_query.lower() in gpt_content.lower():
                 st.markdown(f"🔍 *Contains: '{search_query}'*")
             st.markdown(gpt_content)
             
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 st.markdown("💡 **Ask the EiC:** 'How should I prioritize these development areas?'")
         
         with col2:
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 st.markdown("#### 📝 Gemini (Structure & Audience)")
                 st.markdown("**Focus:** Story structure, narrative potential, reader engagement")
             else:
@@ -357,15 +548,42 @@ if st.session_state.has_analysis:
                 st.markdown("**Focus:** Grammar, style, language clarity")
             
             gemini_content = editor_responses.get("gemini", "Response not available")
+            if "gemini" in session.late_specialists:
+                st.caption("⏱️ Arrived after the Editor-in-Chief synthesis")
             if search_query and search_query.lower() in gemini_content.lower():
                 st.markdown(f"🔍 *Contains: '{search_query}'*")
-            st.markdown(gemini_content)
             
-            if st.session_state.get('content_mode') == 'story':
+            gemini_errors = session.gemini_errors if session.get('content_mode') != 'story' else None
+            if gemini_errors is not None and LOCAL_ONLY_NOTE in gemini_content:
+                st.caption("🔧 Short text - checked by MECCA's local rules only; Gemini was not called.")
+            elif gemini_errors is not None and any(record.source == LOCAL_SOURCE for record in gemini_errors.records):
+                st.caption("🔧 Corrections marked *local pre-check* come from MECCA's rule-based scan, not Gemini.")
+            if gemini_errors is None:
+                st.markdown(gemini_content)
+            elif gemini_errors.is_clean:
+                st.markdown("✅ No mechanical errors detected")
+            else:
+                # Structured view of the correction records, grouped by paragraph
+                type_counts = gemini_errors.type_counts()
+                st.caption(" · ".join(f"{error_type.replace('_', ' ').title()}: {count}" for error_type, count in sorted(type_counts.items())))
+                for paragraph, records in gemini_errors.by_paragraph.items():
+                    st.markdown(f"**Para {paragraph}**")
+                    for record in records:
+                        st.markdown(
+                            f"- `{record.error_type}` ~~{record.wrong}~~ → **{record.fix}**"
+                            + (f" *({record.reason})*" if record.reason else "")
+                            + (" · *local pre-check*" if record.source == LOCAL_SOURCE else "")
+                        )
+                for line in gemini_errors.unparsed:
+                    st.markdown(f"- {line}")
+                with st.expander("Raw Gemini output"):
+                    st.text(gemini_content)
+            
+            if session.get('content_mode') == 'story':
                 st.markdown("💡 **Ask the EiC:** 'Walk me through how you'd structure this story.'")
         
         with col3:
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 st.markdown("#### 🔍 Custom FCC (Verification Coach)")
                 st.markdown("**Focus:** Verification methodology, sourcing strategy")
             else:
@@ -373,17 +591,19 @@ if st.session_state.has_analysis:
                 st.markdown("**Focus:** Verification methodology coaching")
             
             custom_fcc_content = editor_responses.get("custom_fcc", editor_responses.get("perplexity", "Response not available"))
+            if "custom_fcc" in session.late_specialists:
+                st.caption("⏱️ Arrived after the Editor-in-Chief synthesis")
             if search_query and search_query.lower() in custom_fcc_content.lower():
                 st.markdown(f"🔍 *Contains: '{search_query}'*")
             st.markdown(custom_fcc_content)
             
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 st.markdown("💡 **Ask the EiC:** 'What's your verification roadmap for this story?'")
             else:
                 st.markdown("⚠️ **Verification coaching is educational - always verify claims independently through authoritative sources.**")
         
         # Final dialogue encouragement for story mode
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.success("""
             🎯 **Next Step: Engage with the Editor-in-Chief!**
             
@@ -394,25 +614,50 @@ if st.session_state.has_analysis:
     
     with tab3:
         # Set active tab when this tab is accessed
-        if st.session_state.get('form_submitted', False):
-            st.session_state.active_tab = 2
-            st.session_state.form_submitted = False
+        if session.get('form_submitted', False):
+            session.active_tab = 2
+            session.form_submitted = False
             
         st.markdown("## 💬 Ask the Editor-in-Chief")
         
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.markdown("*Continue the story conference dialogue. Ask about the assessment, explore alternatives, understand the editorial thinking.*")
         else:
             st.markdown("*Ask questions about the feedback with complete transparency. The EiC will show you exactly what each specialist found, including their mistakes.*")
         
-        # Display dialogue history
-        for i, exchange in enumerate(st.session_state.dialogue_history):
+        # Display dialogue history - only the newest exchanges are in memory, earlier ones are read back on request
+        exchanges = session.dialogue_history
+        earlier_count = getattr(exchanges, "offset", 0)
+        if earlier_count and st.toggle(f"Show {earlier_count} earlier exchange(s)", key="show_earlier_dialogue"):
+            exchanges = entries_from(exchanges, 0)
+        for i, exchange in enumerate(exchanges):
             st.markdown(f'<div class="chat-message user-message"><strong>You:</strong> {exchange["question"]}</div>', unsafe_allow_html=True)
             st.markdown(f'<div class="chat-message eic-message"><strong>Editor-in-Chief:</strong> {exchange["answer"]}</div>', unsafe_allow_html=True)
+            usage = exchange.get("usage")
+            if usage:
+                st.caption(
+                    f"Input tokens: {usage['input_tokens']:,} · "
+                    f"from prompt cache: {usage['cache_read_input_tokens']:,} "
+                    f"({usage['cache_hit_rate']:.0%} hit rate) · "
+                    f"output tokens: {usage['output_tokens']:,}"
+                )
+            
+            quotes = exchange.get("quotes")
+            if quotes:
+                with st.expander(f"🔎 Where the {len(quotes)} quoted passage(s) came from"):
+                    for attribution in quotes:
+                        if attribution["specialist"] is None:
+                            st.markdown(f"- ❓ \"{attribution['quote']}\" - not found in any specialist response")
+                            continue
+                        label = SPECIALIST_LABELS.get(attribution["specialist"], attribution["specialist"])
+                        location = f", characters {attribution['span'][0]:,}-{attribution['span'][1]:,}" if attribution["span"] else ""
+                        st.markdown(f"- **{label}** ({attribution['score']:.0%} match{location}): \"{attribution['quote']}\"")
+                        if attribution["score"] < 1.0:
+                            st.caption(f"Closest passage: \"{attribution['excerpt']}\"")
         
         # Question input form
         with st.form("dialogue_form"):
-            if st.session_state.get('content_mode') == 'story':
+            if session.get('content_mode') == 'story':
                 placeholder_text = "e.g., 'Why did you rate this as promising but risky?' or 'How would you approach the access challenges?' or 'What if I focused on the economic impact instead?'"
                 help_text = "Ask WHY as well as WHAT. The Editor-in-Chief can explain editorial reasoning and help develop your story concept."
             else:
@@ -431,27 +676,35 @@ if st.session_state.has_analysis:
             if submitted and user_question.strip():
                 anthropic_key = st.secrets.get("ANTHROPIC_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
                 if anthropic_key:
-                    with st.spinner("🤔 Editor-in-Chief is thinking..."):
-                        # Set flag to stay on this tab after rerun
-                        st.session_state.form_submitted = True
-                        
-                        # Use enhanced dialogue handler
-                        eic_answer = enhanced_dialogue_handler(user_question, st.session_state, anthropic_key)
-                        
-                        # Store in dialogue history
-                        st.session_state.dialogue_history.append({
-                            "question": user_question,
-                            "answer": eic_answer
-                        })
-                        
-                        # Rerun to update display
-                        st.rerun()
+                    # Set flag to stay on this tab after rerun
+                    session.form_submitted = True
+                    
+                    # Stream the enhanced dialogue answer as it arrives (validated once complete)
+                    session.last_dialogue_usage = None
+                    session.last_quote_attributions = []
+                    st.markdown(f'<div class="chat-message user-message"><strong>You:</strong> {user_question}</div>', unsafe_allow_html=True)
+                    # Dialogue turns are interactive, so they jump ahead of queued batch reviews
+                    with request_context(session.session_id, PRIORITY_INTERACTIVE):
+                        eic_answer = st.write_stream(enhanced_dialogue_handler_v2_stream(user_question, session, anthropic_key)).strip()
+                    
+                    # Store in dialogue history
+                    append_exchange(
+                        session.dialogue_history, user_question, eic_answer,
+                        session.last_dialogue_usage, session.last_quote_attributions
+                    )
+                    
+                    # Keep the replayed history bounded - older exchanges fold into a summary in the background
+                    update_dialogue_summary(session, anthropic_key)
+                    save_session()
+                    
+                    # Rerun to update display
+                    st.rerun()
                 else:
                     st.error("Anthropic API key not configured for dialogue feature.")
         
         # Educational note and dialogue prompts
-        if not st.session_state.get('dialogue_history'):
-            if st.session_state.get('content_mode') == 'story':
+        if not session.get('dialogue_history'):
+            if session.get('content_mode') == 'story':
                 st.markdown("---")
                 st.markdown("""
                 **🎯 Story Conference Dialogue Ideas:**
@@ -482,7 +735,7 @@ if st.session_state.has_analysis:
 with st.sidebar:
     st.markdown("### 💬 Editorial Dialogue")
     
-    if not st.session_state.get('has_analysis'):
+    if not session.get('has_analysis'):
         if content_mode == "Story Idea (pitch/concept)":
             st.markdown("""
             **After your story conference, engage with the Editor-in-Chief!**
@@ -506,15 +759,15 @@ with st.sidebar:
             **Don't just take the advice - understand the thinking behind it.**
             """)
     else:
-        if st.session_state.get('content_mode') == 'story':
+        if session.get('content_mode') == 'story':
             st.markdown("**🎯 Keep the story conference going!**")
             st.markdown("Ask the Editor-in-Chief to explain their assessment, explore alternatives, or dive deeper into development strategies.")
         else:
             st.markdown("**🎯 Keep the conversation going!**")
             st.markdown("Ask the Editor-in-Chief to explain their reasoning, explore alternatives, or dive deeper into specific concerns.")
         
-        if not st.session_state.get('dialogue_history'):
-            if st.session_state.get('content_mode') == 'story':
+        if not session.get('dialogue_history'):
+            if session.get('content_mode') == 'story':
                 st.markdown("💡 **Try asking:**")
                 st.markdown("""
                 - "Why is [specific concern] the top priority?"
@@ -532,6 +785,32 @@ with st.sidebar:
                 - "Explain the Custom FCC's methodology"
                 - "What would make this piece stronger?"
                 """)
+    
+    # Operator view of shared provider capacity (enable with ENABLE_CAPACITY_MONITOR secret)
+    if st.secrets.get("ENABLE_CAPACITY_MONITOR", False):
+        with st.expander("📊 Provider capacity"):
+            scheduler_stats = get_scheduler_stats()
+            if not scheduler_stats:
+                st.caption("No provider calls yet")
+            for provider, stats in scheduler_stats.items():
+                st.markdown(f"**{provider}**")
+                st.caption(
+                    f"In flight: {stats['in_flight']} · Queued: {stats['queue_depth']} "
+                    f"({stats['queued_interactive']} interactive, {stats['queued_batch']} batch, "
+                    f"{stats['queued_sessions']} sessions) · "
+                    f"Wait avg/p95/max: {stats['avg_wait_seconds']:.1f}s / {stats['p95_wait_seconds']:.1f}s / {stats['max_wait_seconds']:.1f}s"
+                )
+        with st.expander("🧠 Session memory"):
+            memory = session_memory_report()
+            st.caption(
+                f"Sessions in memory: {memory['sessions']} · Total ~{memory['total_bytes'] / 1e6:.1f} MB · "
+                f"Largest ~{memory['largest_bytes'] / 1e3:.0f} KB"
+            )
+            if "session_bytes" in memory:
+                st.markdown(f"**This session:** ~{memory['session_bytes'] / 1e3:.0f} KB")
+                st.caption(" · ".join(
+                    f"{name} {size / 1e3:.0f} KB" for name, size in list(memory["session_fields"].items())[:5]
+                ))
 
 # Footer with enhanced messaging
 st.markdown("---")
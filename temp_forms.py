@@ -105,7 +105,7 @@ def render_article_input():
     # Simplified word limit notice
     st.markdown("""
     <div class="word-limit-notice">
-    <strong>3,000 words max.</strong> Processing may take a minute or more — do not refresh.
+    <strong>Up to 10,000 words.</strong> Articles over 3,000 words are reviewed in sections. Processing may take a minute or more — do not refresh.
     </div>
     """, unsafe_allow_html=True)
 